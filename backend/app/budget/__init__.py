@@ -0,0 +1 @@
+"""Budget bookkeeping for Travista - per-trip expense rollups."""
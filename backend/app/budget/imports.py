@@ -0,0 +1,187 @@
+"""
+Bulk expense ingestion.
+
+Rows from a JSON array or a CSV upload are validated one by one with
+ExpenseCreate, then written in chunks with multi-row INSERT ... RETURNING
+statements, all inside one transaction. Rows that fail validation (or point at
+another user's trip) are reported back with their position instead of failing
+the whole import; with `atomic=true` any error rolls everything back.
+
+CSV uploads are parsed while the request body streams in, so a large bank
+export is never held in memory as a whole. Expected header (case-insensitive,
+extra columns ignored): place, amount, category, date, plus trip_id unless a
+default trip is given, and optionally source.
+
+Configuration (environment variables):
+- IMPORT_MAX_ROWS: most rows accepted per request (default: 5000)
+- IMPORT_MAX_BYTES: largest CSV body accepted (default: 10MB)
+- IMPORT_CHUNK_SIZE: rows per INSERT statement (default: 500)
+"""
+
+import codecs
+import csv
+import io
+import os
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+
+from ..models.expense import Expense
+from ..models.trip import Trip
+from ..schemas.expense import BulkImportResult, ExpenseCreate, RowError
+from . import rollups
+
+IMPORT_MAX_ROWS = int(os.getenv("IMPORT_MAX_ROWS", "5000"))
+IMPORT_MAX_BYTES = int(os.getenv("IMPORT_MAX_BYTES", str(10 * 1024 * 1024)))
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "500"))
+
+CSV_REQUIRED_COLUMNS = {"place", "amount", "category", "date"}
+
+
+def _format_errors(exc: ValidationError) -> list:
+    return [
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+        for error in exc.errors()
+    ]
+
+
+class ExpenseImporter:
+    """
+    Validates rows as they are added and inserts them in chunks.
+    Call finish() once at the end; the caller commits the session.
+    """
+
+    def __init__(self, db, user_id: int, default_trip_id: Optional[int] = None, atomic: bool = False):
+        self.db = db
+        self.user_id = user_id
+        self.default_trip_id = default_trip_id
+        self.atomic = atomic
+        self.rows = 0
+        self.ids: list = []
+        self.errors: list = []
+        self.trip_ids: set = set()
+        self.places: set = set()
+        self._pending: list = []
+        self._owned_trips: set = set()
+
+    async def add(self, data) -> None:
+        self.rows += 1
+        if self.rows > IMPORT_MAX_ROWS:
+            raise HTTPException(status_code=413, detail=f"Too many rows (max {IMPORT_MAX_ROWS})")
+
+        if isinstance(data, dict) and self.default_trip_id is not None:
+            data = {"trip_id": self.default_trip_id, **data}
+        try:
+            item = ExpenseCreate.model_validate(data)
+        except ValidationError as exc:
+            self.errors.append(RowError(row=self.rows, errors=_format_errors(exc)))
+            return
+
+        self._pending.append((self.rows, item))
+        if len(self._pending) >= IMPORT_CHUNK_SIZE:
+            await self._flush()
+
+    async def _flush(self) -> None:
+        pending, self._pending = self._pending, []
+
+        unknown = {item.trip_id for _, item in pending} - self._owned_trips
+        if unknown:
+            res = await self.db.execute(
+                select(Trip.id).where(Trip.id.in_(unknown), Trip.user_id == self.user_id)
+            )
+            self._owned_trips.update(res.scalars().all())
+
+        values = []
+        for row, item in pending:
+            if item.trip_id not in self._owned_trips:
+                self.errors.append(RowError(row=row, errors=["trip_id: Trip not found"]))
+                continue
+            values.append({**item.model_dump(exclude={"ocr_confidence"}), "user_id": self.user_id})
+        if not values or (self.atomic and self.errors):
+            return
+
+        res = await self.db.execute(
+            insert(Expense).returning(Expense.id, sort_by_parameter_order=True),
+            values,
+        )
+        self.ids.extend(res.scalars().all())
+        self.trip_ids.update(value["trip_id"] for value in values)
+        self.places.update((value["place"], value["category"]) for value in values)
+        await rollups.apply_expenses(self.db, [Expense(**value) for value in values])
+
+    async def finish(self) -> BulkImportResult:
+        await self._flush()
+        self.errors.sort(key=lambda error: error.row)
+        if self.atomic and self.errors:
+            await self.db.rollback()
+            self.ids = []
+            self.trip_ids = set()
+            self.places = set()
+        return BulkImportResult(created=len(self.ids), ids=self.ids, errors=self.errors)
+
+
+async def csv_records(chunks: AsyncIterator[bytes], max_bytes: int = IMPORT_MAX_BYTES) -> AsyncIterator[list]:
+    """
+    Parse CSV records from a byte stream as it arrives. Text is handed to the
+    csv module only up to the last line break outside a quoted field, so
+    quoted values containing newlines survive chunk boundaries.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    received = 0
+
+    async for chunk in chunks:
+        received += len(chunk)
+        if received > max_bytes:
+            raise HTTPException(status_code=413, detail=f"File is too large (max {max_bytes // (1024 * 1024)}MB)")
+        pending += decoder.decode(chunk)
+
+        cut = 0
+        in_quotes = False
+        position = 0
+        for line in pending.split("\n")[:-1]:
+            position += len(line) + 1
+            if line.count('"') % 2:
+                in_quotes = not in_quotes
+            if not in_quotes:
+                cut = position
+        if cut:
+            for record in csv.reader(io.StringIO(pending[:cut], newline="")):
+                yield record
+            pending = pending[cut:]
+
+    pending += decoder.decode(b"", final=True)
+    for record in csv.reader(io.StringIO(pending, newline="")):
+        yield record
+
+
+async def import_csv(importer: ExpenseImporter, chunks: AsyncIterator[bytes]) -> None:
+    """Feed CSV rows from a byte stream into the importer."""
+    header = None
+    async for record in csv_records(chunks):
+        if not any(value.strip() for value in record):
+            continue
+        if header is None:
+            header = [name.strip().lower() for name in record]
+            required = set(CSV_REQUIRED_COLUMNS)
+            if importer.default_trip_id is None:
+                required.add("trip_id")
+            missing = required - set(header)
+            if missing:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"CSV header is missing columns: {', '.join(sorted(missing))}",
+                )
+            continue
+
+        # Blank cells fall back to the schema defaults
+        await importer.add({
+            name: value.strip()
+            for name, value in zip(header, record)
+            if name and value.strip()
+        })
+
+    if header is None:
+        raise HTTPException(status_code=400, detail="CSV file is empty")
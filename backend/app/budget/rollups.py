@@ -0,0 +1,130 @@
+"""
+Per-trip expense rollups.
+
+budget.trip_rollups holds running totals per trip: one trip-total row, one row
+per category and one per day. add_expense and delete_expense adjust them in
+the same transaction as the expense itself, so summary reads touch a handful
+of rollup rows instead of every expense.
+
+If the rollups ever drift (manual SQL, restored backups, ...), rebuild them
+from budget.expenses:
+
+    cd backend
+    python -m app.budget.rollups rebuild            # every trip
+    python -m app.budget.rollups rebuild --trip 42  # one trip
+"""
+
+import argparse
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, text, tuple_
+from sqlalchemy.dialects.postgresql import insert
+
+from ..models.expense import Expense, TripRollup
+
+logger = logging.getLogger(__name__)
+
+TRIP, CATEGORY, DAY = "trip", "category", "day"
+
+# Totals recomputed from scratch in one pass over the expenses
+REBUILD_SQL = """
+INSERT INTO budget.trip_rollups (trip_id, user_id, dimension, key, total, count)
+SELECT trip_id, user_id,
+       CASE grouping(category, date) WHEN 3 THEN 'trip' WHEN 1 THEN 'category' ELSE 'day' END,
+       CASE grouping(category, date) WHEN 3 THEN '' WHEN 1 THEN category ELSE date::text END,
+       sum(amount), count(*)
+FROM budget.expenses
+{where}
+GROUP BY trip_id, user_id, GROUPING SETS ((category), (date), ())
+HAVING grouping(category, date) <> 2 OR date IS NOT NULL
+"""
+
+
+async def apply_expenses(db, expenses: Iterable[Expense], sign: int = 1) -> None:
+    """
+    Add (sign=1) or remove (sign=-1) expenses from their trips' rollups with
+    one upsert. Runs inside the caller's transaction; commit together with
+    the expenses.
+    """
+    deltas = defaultdict(lambda: [0.0, 0])
+    for expense in expenses:
+        keys = [(TRIP, ""), (CATEGORY, expense.category)]
+        if expense.date is not None:
+            keys.append((DAY, expense.date.isoformat()))
+        for dimension, key in keys:
+            delta = deltas[(expense.trip_id, expense.user_id, dimension, key)]
+            delta[0] += sign * expense.amount
+            delta[1] += sign
+    if not deltas:
+        return
+
+    stmt = insert(TripRollup).values([
+        {"trip_id": trip_id, "user_id": user_id, "dimension": dimension, "key": key, "total": total, "count": count}
+        for (trip_id, user_id, dimension, key), (total, count) in deltas.items()
+    ])
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=["trip_id", "user_id", "dimension", "key"],
+        set_={
+            "total": TripRollup.total + stmt.excluded.total,
+            "count": TripRollup.count + stmt.excluded.count,
+        },
+    ))
+
+    if sign < 0:
+        await db.execute(delete(TripRollup).where(
+            tuple_(TripRollup.trip_id, TripRollup.user_id).in_({(t, u) for t, u, _, _ in deltas}),
+            TripRollup.count <= 0,
+        ))
+
+
+async def apply_expense(db, expense: Expense, sign: int = 1) -> None:
+    """Add (sign=1) or remove (sign=-1) one expense from its trip's rollups."""
+    await apply_expenses(db, [expense], sign)
+
+
+async def rebuild(conn, trip_id: Optional[int] = None) -> int:
+    """
+    Recompute rollups from budget.expenses (all trips, or one). Expense writes
+    are blocked until the caller's transaction ends so none are missed.
+    Returns the number of rollup rows written.
+    """
+    await conn.execute(text("LOCK TABLE budget.expenses IN SHARE MODE"))
+    params = {}
+    where = ""
+    if trip_id is not None:
+        where = "WHERE trip_id = :trip_id"
+        params["trip_id"] = trip_id
+
+    await conn.execute(text(f"DELETE FROM budget.trip_rollups {where}"), params)
+    result = await conn.execute(text(REBUILD_SQL.format(where=where)), params)
+    return result.rowcount
+
+
+async def _rebuild_command(trip_id: Optional[int]) -> None:
+    from ..database import engine
+
+    try:
+        async with engine.begin() as conn:
+            rows = await rebuild(conn, trip_id)
+        logger.info("trip rollups rebuilt", extra={"trip_id": trip_id, "rows": rows})
+        print(f"Rebuilt {rows} rollup rows" + (f" for trip {trip_id}" if trip_id is not None else ""))
+    finally:
+        await engine.dispose()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.budget.rollups")
+    commands = parser.add_subparsers(dest="command", required=True)
+    rebuild_parser = commands.add_parser("rebuild", help="recompute rollups from budget.expenses")
+    rebuild_parser.add_argument("--trip", type=int, help="only this trip id")
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        asyncio.run(_rebuild_command(args.trip))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Expense audit trail.
+
+Request handlers call `expense_audit.emit(...)`, which only appends to an
+in-memory ring buffer. A background task drains the ring in batches and
+appends them to a daily NDJSON file off the event loop, deleting files older
+than the retention window. If the writer falls behind, the ring drops the
+oldest unwritten events rather than blocking requests.
+
+Configuration (environment variables):
+- AUDIT_LOG_DIR: directory for audit files (default: logs/audit)
+- AUDIT_BUFFER_SIZE: ring buffer capacity in events (default: 10000)
+- AUDIT_FLUSH_INTERVAL: seconds between flushes (default: 1.0)
+- AUDIT_FLUSH_BATCH: flush early once this many events are pending (default: 500)
+- AUDIT_RETENTION_DAYS: days of audit files to keep, 0 keeps everything (default: 90)
+"""
+
+import asyncio
+import json
+import logging
+import os
+from collections import deque
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import List, Optional
+
+AUDIT_LOG_DIR = Path(os.getenv("AUDIT_LOG_DIR", "logs/audit"))
+AUDIT_BUFFER_SIZE = int(os.getenv("AUDIT_BUFFER_SIZE", "10000"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1.0"))
+AUDIT_FLUSH_BATCH = int(os.getenv("AUDIT_FLUSH_BATCH", "500"))
+AUDIT_RETENTION_DAYS = int(os.getenv("AUDIT_RETENTION_DAYS", "90"))
+
+logger = logging.getLogger(__name__)
+
+
+class AuditSink:
+    def __init__(
+        self,
+        name: str,
+        directory: Path = AUDIT_LOG_DIR,
+        buffer_size: int = AUDIT_BUFFER_SIZE,
+        flush_interval: float = AUDIT_FLUSH_INTERVAL,
+        flush_batch: int = AUDIT_FLUSH_BATCH,
+        retention_days: int = AUDIT_RETENTION_DAYS,
+    ):
+        self.name = name
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self.retention_days = retention_days
+        self.dropped = 0
+        self._ring = deque(maxlen=buffer_size)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._pruned_on: Optional[date] = None
+
+    def emit(self, action: str, **fields) -> None:
+        """Record an audit event. Never blocks and never raises."""
+        if len(self._ring) == self._ring.maxlen:
+            self.dropped += 1
+        self._ring.append({
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "action": action,
+            **fields,
+        })
+        if self._wakeup is not None and len(self._ring) >= self.flush_batch:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopping = False
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background writer and flush whatever is still buffered."""
+        if self._task is not None:
+            # Let an in-progress write finish instead of cancelling it
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+            self._wakeup = None
+        await self.flush()
+
+    async def flush(self) -> int:
+        """Write all buffered events. Returns the number written."""
+        written = 0
+        while self._ring:
+            batch = self._drain(self.flush_batch)
+            try:
+                await asyncio.to_thread(self._write, batch)
+            except Exception as e:
+                logger.error("audit write failed, %d events lost: %s", len(batch), e)
+                return written
+            written += len(batch)
+        return written
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def _drain(self, limit: int) -> List[dict]:
+        batch = []
+        while self._ring and len(batch) < limit:
+            batch.append(self._ring.popleft())
+        return batch
+
+    def _path_for(self, day: date) -> Path:
+        return self.directory / f"{self.name}-{day.isoformat()}.ndjson"
+
+    def _write(self, batch: List[dict]) -> None:
+        today = datetime.now(timezone.utc).date()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._path_for(today).open("a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(event, default=str) + "\n" for event in batch))
+        if self._pruned_on != today:
+            self._prune(today)
+            self._pruned_on = today
+
+    def _prune(self, today: date) -> None:
+        if self.retention_days <= 0:
+            return
+        cutoff = self._path_for(today - timedelta(days=self.retention_days)).name
+        for path in self.directory.glob(f"{self.name}-*.ndjson"):
+            # ISO dates sort lexically, so older files compare lower
+            if path.name < cutoff:
+                path.unlink(missing_ok=True)
+
+
+expense_audit = AuditSink("expenses")
@@ -0,0 +1,92 @@
+"""
+Content-addressed blob storage.
+
+Blobs are keyed by the SHA-256 of their bytes plus a file extension
+("<64 hex>.<ext>"), so identical uploads are stored once, keys never change
+meaning, and a key doubles as a strong ETag. Blobs are written to a temp file
+and renamed into place, so readers never see partial files.
+
+Only the local filesystem backend exists today; an S3-compatible backend can
+implement the same put/path/delete methods.
+
+Configuration (environment variables):
+- BLOB_STORE_DIR: root directory for stored blobs (default: data/blobs)
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+BLOB_STORE_DIR = os.getenv("BLOB_STORE_DIR", "data/blobs")
+
+KEY_PATTERN = re.compile(r"^[0-9a-f]{64}\.[a-z0-9]{2,5}$")
+
+CONTENT_TYPES = {
+    "webp": "image/webp",
+    "png": "image/png",
+    "jpg": "image/jpeg",
+}
+
+
+def blob_key(data: bytes, extension: str) -> str:
+    return f"{hashlib.sha256(data).hexdigest()}.{extension}"
+
+
+def content_type_for(key: str) -> str:
+    return CONTENT_TYPES.get(key.rsplit(".", 1)[-1], "application/octet-stream")
+
+
+class LocalBlobStore:
+    """Blobs under root/<first two hex chars>/<key>."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        if not KEY_PATTERN.match(key):
+            raise ValueError(f"Invalid blob key: {key!r}")
+        return self.root / key[:2] / key
+
+    def _write(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    async def put(self, data: bytes, extension: str) -> str:
+        """Store `data` and return its key (a no-op if it is already stored)."""
+        key = blob_key(data, extension)
+        await run_in_threadpool(self._write, key, data)
+        return key
+
+    def path(self, key: str) -> Optional[Path]:
+        """Local file for `key`, or None if the key is malformed or missing."""
+        try:
+            path = self._path(key)
+        except ValueError:
+            return None
+        return path if path.is_file() else None
+
+    async def delete(self, key: str) -> None:
+        path = self.path(key)
+        if path is not None:
+            await run_in_threadpool(path.unlink, True)
+
+
+blob_store = LocalBlobStore(BLOB_STORE_DIR)
@@ -0,0 +1,97 @@
+"""
+Database engine settings.
+
+Configuration (environment variables):
+- DATABASE_URL: primary database URL (required)
+- DATABASE_READ_URL: optional read-replica URL
+- DB_POOL_SIZE: connections kept open per engine (default: 10)
+- DB_MAX_OVERFLOW: extra connections allowed under load (default: 20)
+- DB_POOL_TIMEOUT: seconds to wait for a free connection (default: 30)
+- DB_POOL_RECYCLE: seconds before a connection is replaced (default: 1800)
+- DB_POOL_PRE_PING: test connections before use (default: true)
+- DB_STATEMENT_TIMEOUT_MS: server-side statement timeout, 0 disables (default: 30000)
+- DB_ECHO: "false", "true" or "debug" SQL logging (default: false)
+- DB_STATEMENT_CACHE_SIZE: asyncpg prepared statement cache size, 0 for pgbouncer (default: 100)
+- DB_READ_YOUR_WRITES_SECONDS: after a user's write, their reads use the primary for this long (default: 5)
+- DB_REPLICA_RETRY_SECONDS: after a replica connection error, reads use the primary for this long (default: 30)
+- DB_REQUIRE_CURRENT_SCHEMA: refuse to start when migrations are pending (default: true)
+"""
+
+import os
+from typing import Optional
+
+from sqlalchemy.engine import make_url
+
+
+def _bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+def _echo(value: str):
+    value = value.strip().lower()
+    if value == "debug":
+        return "debug"
+    return value in ("1", "true", "yes", "on")
+
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL") or None
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = _bool("DB_POOL_PRE_PING", "true")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+DB_ECHO = _echo(os.getenv("DB_ECHO", "false"))
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+DB_READ_YOUR_WRITES_SECONDS = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))
+DB_REPLICA_RETRY_SECONDS = float(os.getenv("DB_REPLICA_RETRY_SECONDS", "30"))
+DB_REQUIRE_CURRENT_SCHEMA = _bool("DB_REQUIRE_CURRENT_SCHEMA", "true")
+
+
+def engine_options() -> dict:
+    """Keyword arguments for create_async_engine."""
+    connect_args = {
+        # asyncpg's own cache and SQLAlchemy's adapter cache are sized together
+        "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+    }
+    if DB_STATEMENT_TIMEOUT_MS > 0:
+        connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+
+    return {
+        "echo": DB_ECHO,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+
+
+def _safe_url(url: Optional[str]) -> Optional[str]:
+    if not url:
+        return None
+    try:
+        return make_url(url).render_as_string(hide_password=True)
+    except Exception:
+        return "<invalid url>"
+
+
+def describe() -> dict:
+    """Effective database settings, with passwords masked, for startup logs."""
+    return {
+        "url": _safe_url(DATABASE_URL),
+        "read_url": _safe_url(DATABASE_READ_URL),
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "statement_timeout_ms": DB_STATEMENT_TIMEOUT_MS,
+        "echo": DB_ECHO,
+        "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+        "read_your_writes_seconds": DB_READ_YOUR_WRITES_SECONDS,
+    }
@@ -0,0 +1,92 @@
+"""
+Streaming exports.
+
+Rows are read through a server-side cursor in batches of EXPORT_BATCH_ROWS
+and each batch is encoded and written to the client before the next one is
+fetched, so memory use does not grow with the number of rows exported.
+
+Formats:
+- csv: header row plus one line per row (lists joined with ";")
+- ndjson: one JSON object per line
+
+Configuration (environment variables):
+- EXPORT_BATCH_ROWS: rows fetched per cursor round-trip (default: 1000)
+"""
+
+import csv
+import io
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+
+from fastapi.responses import StreamingResponse
+
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "1000"))
+
+
+class ExportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+MEDIA_TYPES = {
+    ExportFormat.csv: "text/csv; charset=utf-8",
+    ExportFormat.ndjson: "application/x-ndjson",
+}
+
+
+def _json_value(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return ";".join(str(item) for item in value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _encode_csv(rows, columns) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+def _encode_ndjson(rows, columns) -> str:
+    return "".join(
+        json.dumps(dict(zip(columns, row)), default=_json_value, ensure_ascii=False) + "\n"
+        for row in rows
+    )
+
+
+async def _stream(db, query, columns, fmt: ExportFormat):
+    encode = _encode_csv if fmt == ExportFormat.csv else _encode_ndjson
+    if fmt == ExportFormat.csv:
+        yield _encode_csv([columns], columns)
+
+    result = await db.stream(query.execution_options(yield_per=EXPORT_BATCH_ROWS))
+    async for batch in result.partitions():
+        yield encode(batch, columns)
+
+
+def export_response(db, query, fmt: ExportFormat, filename: str) -> StreamingResponse:
+    """
+    Stream the rows of a column `select()` as a file download.
+    `db` must stay open until the response is sent (a yield dependency does).
+    """
+    columns = [column.key for column in query.selected_columns]
+    return StreamingResponse(
+        _stream(db, query, columns, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt.value}"'},
+    )
@@ -0,0 +1,178 @@
+"""
+Profile picture processing.
+
+Uploads are decoded with Pillow (which also rejects anything that is not an
+image), rotated upright from their EXIF orientation, stripped of metadata and
+re-encoded as WebP: one full-size copy capped at PROFILE_IMAGE_MAX_SIDE plus
+square thumbnails for each of PROFILE_THUMBNAIL_SIZES. The results go to the
+content-addressed blob store and are served by /images/{key}. When a
+picture is replaced or cleared, its blobs are deleted once no profile
+references them any more (identical uploads share a key).
+
+Pictures saved before the blob store existed are data URLs in
+auth.profile_pictures.image_url; move them into the store with:
+
+    cd backend
+    python -m app.core.images backfill
+
+Configuration (environment variables):
+- PROFILE_IMAGE_MAX_SIDE: longest side of the stored picture in px (default: 1024)
+- PROFILE_THUMBNAIL_SIZES: comma-separated square thumbnail sizes (default: 64,256)
+- IMAGE_QUALITY: WebP quality, 1-100 (default: 85)
+- IMAGE_MAX_PIXELS: largest decoded image accepted, width*height (default: 40000000)
+"""
+
+import argparse
+import asyncio
+import base64
+import binascii
+import io
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Union
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .blob_store import blob_store
+
+logger = logging.getLogger(__name__)
+
+PROFILE_IMAGE_MAX_SIDE = int(os.getenv("PROFILE_IMAGE_MAX_SIDE", "1024"))
+PROFILE_THUMBNAIL_SIZES = [
+    int(size) for size in os.getenv("PROFILE_THUMBNAIL_SIZES", "64,256").split(",") if size.strip()
+]
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "85"))
+IMAGE_MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", "40000000"))
+
+
+@dataclass
+class StoredImage:
+    key: str
+    thumbnails: Dict[str, str] = field(default_factory=dict)  # size (px) -> key
+
+
+def _encode(image: Image.Image) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, "WEBP", quality=IMAGE_QUALITY, method=4)
+    return buffer.getvalue()
+
+
+def _render(source: Union[bytes, memoryview, str]) -> tuple:
+    """Decode and re-encode an image. Returns (full-size bytes, {size: thumbnail bytes})."""
+    if isinstance(source, (bytes, memoryview)):
+        source = io.BytesIO(source)
+    try:
+        with Image.open(source) as image:
+            if image.width * image.height > IMAGE_MAX_PIXELS:
+                raise HTTPException(status_code=400, detail="Image dimensions are too large.")
+            image = ImageOps.exif_transpose(image)
+            image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        raise HTTPException(status_code=400, detail="Could not read the image. Please upload a JPG, PNG or WebP file.")
+
+    full = image.copy()
+    full.thumbnail((PROFILE_IMAGE_MAX_SIDE, PROFILE_IMAGE_MAX_SIDE), Image.LANCZOS)
+    thumbnails = {
+        size: _encode(ImageOps.fit(image, (size, size), Image.LANCZOS))
+        for size in PROFILE_THUMBNAIL_SIZES
+    }
+    return _encode(full), thumbnails
+
+
+async def store_profile_image(source: Union[bytes, memoryview, str]) -> StoredImage:
+    """Process an image (bytes or a file path) and store it with its thumbnails."""
+    full, thumbnails = await run_in_threadpool(_render, source)
+    stored = StoredImage(key=await blob_store.put(full, "webp"))
+    for size, data in thumbnails.items():
+        stored.thumbnails[str(size)] = await blob_store.put(data, "webp")
+    return stored
+
+
+async def release_profile_image(db, image_key: Optional[str], thumbnails: Optional[dict]) -> None:
+    """
+    Delete a replaced or cleared picture's blobs unless another profile still
+    uses the same image. Call after the change is committed.
+    """
+    from sqlalchemy import exists, select
+
+    from ..models.profile_picture import ProfilePicture
+
+    if not image_key:
+        return
+    in_use = await db.scalar(select(exists().where(ProfilePicture.image_key == image_key)))
+    if in_use:
+        return
+    # Thumbnails are derived from the same upload, so they go with it
+    for key in (image_key, *(thumbnails or {}).values()):
+        try:
+            await blob_store.delete(key)
+        except OSError as e:
+            logger.warning("deleting blob %s failed: %s", key, e)
+
+
+def decode_data_url(data_url: str) -> bytes:
+    """Bytes of a base64 `data:image/...;base64,` URL."""
+    header, sep, payload = data_url.partition(",")
+    if not sep or not header.startswith("data:image/") or not header.endswith(";base64"):
+        raise HTTPException(status_code=400, detail="Profile image must be a base64 image data URL.")
+    try:
+        return base64.b64decode(payload, validate=True)
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Profile image data is not valid base64.")
+
+
+async def backfill_profile_pictures() -> int:
+    """Move data-URL profile pictures into the blob store. Returns rows converted."""
+    from sqlalchemy import select
+
+    from ..database import AsyncSessionLocal
+    from ..models.profile_picture import ProfilePicture
+    from ..models.user import User  # noqa: F401  (resolves the user_id foreign key)
+
+    converted = 0
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(ProfilePicture).where(
+                ProfilePicture.image_key.is_(None),
+                ProfilePicture.image_url.like("data:%"),
+            )
+        )
+        for picture in result.scalars():
+            try:
+                stored = await store_profile_image(decode_data_url(picture.image_url))
+            except HTTPException as e:
+                logger.warning("profile picture skipped", extra={"picture_id": picture.id, "reason": e.detail})
+                continue
+            picture.image_key = stored.key
+            picture.thumbnails = stored.thumbnails
+            picture.image_url = None
+            converted += 1
+            await db.commit()
+    return converted
+
+
+async def _backfill_command() -> None:
+    from ..database import engine
+
+    try:
+        converted = await backfill_profile_pictures()
+        print(f"Moved {converted} profile pictures into the blob store")
+    finally:
+        await engine.dispose()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.core.images")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("backfill", help="move data-URL profile pictures into the blob store")
+    args = parser.parse_args(argv)
+
+    if args.command == "backfill":
+        asyncio.run(_backfill_command())
+
+
+if __name__ == "__main__":
+    main()
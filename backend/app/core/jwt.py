@@ -7,8 +7,11 @@ from .config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_DELTA
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
 
-    expire = datetime.now(timezone.utc) + ACCESS_TOKEN_EXPIRE_DELTA
-    to_encode.update({"exp": expire})
+    now = datetime.now(timezone.utc)
+    expire = now + ACCESS_TOKEN_EXPIRE_DELTA
+    # iat lets password changes revoke every token issued before them
+    # (fractional seconds, so a token issued right after a change stays valid)
+    to_encode.update({"exp": expire, "iat": now.timestamp()})
 
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
@@ -0,0 +1,208 @@
+"""
+Request and database metrics in Prometheus text format.
+
+MetricsMiddleware records, per route template (e.g. /trip/{trip_id}, so ids
+do not multiply series): request counts by status code, latency histograms,
+and per-request database query counts and time. Query counts and time come
+from SQLAlchemy cursor events on the engines passed to instrument_engine(),
+attributed to the request that issued them through a context variable.
+Requests in flight are tracked per router (first path segment of the router
+prefixes passed in, e.g. /trip), since the route template is only known once
+routing has run.
+
+Recording is a few dict updates per request on the event loop, with no locks
+or background work; rendering happens only when /metrics is scraped. Values
+are per worker process: scrape each worker, or run one worker per target.
+
+Configuration (environment variables):
+- METRICS_TOKEN: if set, /metrics requires "Authorization: Bearer <token>" (default: unset)
+"""
+
+import os
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+DB_QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+DB_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# [queries, seconds] for the request being served, None outside requests
+_db_usage: ContextVar[Optional[list]] = ContextVar("db_usage", default=None)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)) + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labels, labels)} {value:g}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: tuple = (), amount: float = 1.0) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labels: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # labels -> [count per bucket (+Inf last), sum]
+        self._values: Dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float) -> None:
+        entry = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        bucket_names = self.labels + ("le",)
+        for labels, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                yield f"{self.name}_bucket{_format_labels(bucket_names, labels + (le,))} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labels, labels)} {total:g}"
+            yield f"{self.name}_count{_format_labels(self.labels, labels)} {cumulative}"
+
+
+requests_total = Counter(
+    "http_requests_total", "HTTP requests by route template and status code.",
+    ("method", "route", "status"),
+)
+request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency, until the response body is sent.",
+    ("method", "route"), LATENCY_BUCKETS,
+)
+requests_in_progress = Gauge(
+    "http_requests_in_progress", "HTTP requests being served, by router.",
+    ("router",),
+)
+request_db_queries = Histogram(
+    "http_request_db_queries", "Database queries issued per HTTP request.",
+    ("method", "route"), DB_QUERY_BUCKETS,
+)
+request_db_duration = Histogram(
+    "http_request_db_duration_seconds", "Time spent in database queries per HTTP request.",
+    ("method", "route"), DB_TIME_BUCKETS,
+)
+
+REGISTRY: List = [requests_total, request_duration, requests_in_progress, request_db_queries, request_db_duration]
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _db_usage.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    usage = _db_usage.get()
+    starts = conn.info.get("query_start")
+    if usage is not None and starts:
+        usage[0] += 1
+        usage[1] += time.perf_counter() - starts.pop()
+
+
+def _handle_error(context):
+    # Failed statements skip after_cursor_execute
+    if context.connection is not None:
+        _after_cursor_execute(context.connection, None, None, None, None, False)
+
+
+def instrument_engine(engine) -> None:
+    """Count queries and query time on `engine` (sync or async) towards the current request."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording the request metrics above. Streaming responses are timed to their last byte."""
+
+    def __init__(self, app, prefixes: Sequence[str] = ()):
+        self.app = app
+        # First path segments of the included routers' prefixes, e.g. {"auth", "trip", "budget"}
+        self._routers = frozenset(prefix.split("/")[1] for prefix in prefixes if prefix.startswith("/"))
+
+    def _router_of(self, scope) -> str:
+        segment = scope["path"].split("/", 2)[1]
+        return f"/{segment}" if segment in self._routers else "other"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        router = self._router_of(scope)
+        status_code = 500
+        usage = [0, 0.0]
+        token = _db_usage.set(usage)
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        requests_in_progress.inc((router,))
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _db_usage.reset(token)
+            requests_in_progress.dec((router,))
+
+            # Set by the router once a route matched
+            route = scope.get("route")
+            labels: Tuple[str, str] = (scope["method"], getattr(route, "path", "unmatched"))
+            requests_total.inc(labels + (str(status_code),))
+            request_duration.observe(labels, elapsed)
+            request_db_queries.observe(labels, usage[0])
+            request_db_duration.observe(labels, usage[1])
@@ -0,0 +1,308 @@
+"""
+On-demand request profiling.
+
+ProfilingMiddleware profiles a request when it carries a valid
+X-Profile-Token header, or at random with probability PROFILE_SAMPLE_RATE
+(optionally only for paths under PROFILE_SAMPLE_PATHS). A sampler thread
+takes the request's stack every PROFILE_INTERVAL_MS: while the request is
+running on the event loop that is the loop thread's stack down from the
+request's coroutine; while it is suspended it is the chain of awaits it is
+waiting on, ending in an "[await ...]" frame. Profiles are therefore wall
+clock, and time spent in other requests is not attributed to this one.
+Work handed to thread or process pools shows up as the await on it.
+
+Each profile is written as collapsed stacks ("frame;frame;frame count",
+readable by flamegraph.pl and speedscope) plus a JSON metadata file under
+PROFILE_DIR, off the event loop once the response has been sent. The
+response carries X-Profile-Id. Only the newest PROFILE_MAX_COUNT profiles
+younger than PROFILE_RETENTION_DAYS are kept. Admin routes under
+/admin/profiles list and download them.
+
+Configuration (environment variables):
+- PROFILE_TOKEN: token for the X-Profile-Token header and the admin routes; unset disables both (default: unset)
+- PROFILE_SAMPLE_RATE: fraction of requests profiled without the header (default: 0)
+- PROFILE_SAMPLE_PATHS: comma-separated path prefixes sampling applies to (default: all)
+- PROFILE_INTERVAL_MS: milliseconds between stack samples (default: 5)
+- PROFILE_MAX_CONCURRENT: requests profiled at once per worker, others run unprofiled (default: 2)
+- PROFILE_DIR: directory for profiles (default: data/profiles)
+- PROFILE_MAX_COUNT: profiles kept (default: 200)
+- PROFILE_RETENTION_DAYS: days profiles are kept (default: 7)
+"""
+
+import asyncio
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from fastapi.concurrency import run_in_threadpool
+
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SAMPLE_PATHS = tuple(p.strip() for p in os.getenv("PROFILE_SAMPLE_PATHS", "").split(",") if p.strip())
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_MAX_CONCURRENT = int(os.getenv("PROFILE_MAX_CONCURRENT", "2"))
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "data/profiles"))
+PROFILE_MAX_COUNT = int(os.getenv("PROFILE_MAX_COUNT", "200"))
+PROFILE_RETENTION_DAYS = float(os.getenv("PROFILE_RETENTION_DAYS", "7"))
+
+PROFILE_ID_PATTERN = re.compile(r"^\d{8}T\d{9}-[0-9a-f]{8}$")
+
+# Listing and downloading profiles is not itself profiled
+ADMIN_PREFIX = "/admin/profiles"
+
+logger = logging.getLogger(__name__)
+
+
+def token_matches(value: Optional[str]) -> bool:
+    return bool(PROFILE_TOKEN) and value is not None and hmac.compare_digest(value, PROFILE_TOKEN)
+
+
+@lru_cache(maxsize=4096)
+def _short_path(filename: str) -> str:
+    for marker in ("site-packages/", "backend/"):
+        index = filename.rfind(marker)
+        if index >= 0:
+            return filename[index + len(marker):]
+    return os.path.basename(filename)
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    # ';' separates frames in collapsed stacks
+    return f"{name} ({_short_path(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+
+class RequestSampler:
+    """Samples the stack of one request's coroutine from a background thread."""
+
+    def __init__(self, coro, interval: float):
+        self.coro = coro
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self._sample()
+            except Exception:
+                # Frames change under us; a torn sample is just skipped
+                pass
+
+    def _sample(self) -> None:
+        root = self.coro.cr_frame
+        if root is None:
+            return
+
+        # Running: the loop thread's stack passes through the request's coroutine
+        stack = []
+        frame = sys._current_frames().get(self.thread_id)
+        while frame is not None and frame is not root:
+            stack.append(frame)
+            frame = frame.f_back
+
+        if frame is root:
+            stack.append(root)
+            names = [_frame_name(f) for f in reversed(stack)]
+        else:
+            # Suspended: follow what each coroutine in the chain is awaiting
+            names = []
+            awaitable = self.coro
+            while awaitable is not None:
+                frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+                if frame is None:
+                    names.append(f"[await {type(awaitable).__name__}]")
+                    break
+                names.append(_frame_name(frame))
+                awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+
+        self.stacks[";".join(names)] += 1
+        self.samples += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfileStore:
+    """Profiles on disk: <id>.collapsed with <id>.json metadata, pruned by count and age."""
+
+    def __init__(
+        self,
+        directory: Path = PROFILE_DIR,
+        max_count: int = PROFILE_MAX_COUNT,
+        retention_days: float = PROFILE_RETENTION_DAYS,
+    ):
+        self.directory = directory
+        self.max_count = max_count
+        self.retention_days = retention_days
+
+    @staticmethod
+    def new_id() -> str:
+        now = datetime.now(timezone.utc)
+        return f"{now:%Y%m%dT%H%M%S}{now.microsecond // 1000:03d}-{uuid.uuid4().hex[:8]}"
+
+    def path(self, profile_id: str) -> Optional[Path]:
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        path = self.directory / f"{profile_id}.collapsed"
+        return path if path.is_file() else None
+
+    def save(self, profile_id: str, collapsed: str, meta: dict) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / f"{profile_id}.collapsed").write_text(collapsed)
+        (self.directory / f"{profile_id}.json").write_text(json.dumps(meta))
+        self.prune()
+
+    def meta(self, profile_id: str) -> dict:
+        try:
+            return json.loads((self.directory / f"{profile_id}.json").read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def list(self) -> List[dict]:
+        """Metadata of stored profiles, newest first."""
+        profiles = []
+        for path in sorted(self.directory.glob("*.json"), reverse=True):
+            try:
+                profiles.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                continue
+        return profiles
+
+    def prune(self) -> None:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.retention_days)
+        oldest_kept = f"{cutoff:%Y%m%dT%H%M%S}"
+        # Ids start with their UTC timestamp, so name order is age order
+        ids = sorted((p.stem for p in self.directory.glob("*.json")), reverse=True)
+        for index, profile_id in enumerate(ids):
+            if index >= self.max_count or profile_id < oldest_kept:
+                for suffix in (".collapsed", ".json"):
+                    try:
+                        (self.directory / f"{profile_id}{suffix}").unlink()
+                    except OSError:
+                        pass
+
+
+profile_store = ProfileStore()
+
+
+def to_speedscope(profile_id: str, collapsed: str, interval_ms: float) -> dict:
+    """Convert collapsed stacks to a speedscope sampled profile (weights in milliseconds)."""
+    frames: Dict[str, int] = {}
+    samples, weights = [], []
+    for line in collapsed.splitlines():
+        stack, _, count = line.rpartition(" ")
+        samples.append([frames.setdefault(name, len(frames)) for name in stack.split(";")])
+        weights.append(int(count) * interval_ms)
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": [{"name": name} for name in frames]},
+        "profiles": [{
+            "type": "sampled",
+            "name": profile_id,
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": samples,
+            "weights": weights,
+        }],
+        "name": profile_id,
+        "exporter": "travista",
+    }
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling requests selected by header or sampling (see module docstring)."""
+
+    def __init__(self, app):
+        self.app = app
+        self._active = 0
+        self._writes: Set[asyncio.Task] = set()
+
+    def _trigger(self, scope) -> Optional[str]:
+        if PROFILE_TOKEN:
+            for name, value in scope["headers"]:
+                if name == b"x-profile-token":
+                    return "header" if token_matches(value.decode("latin-1")) else None
+        if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+            if not PROFILE_SAMPLE_PATHS or scope["path"].startswith(PROFILE_SAMPLE_PATHS):
+                return "sample"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(ADMIN_PREFIX):
+            await self.app(scope, receive, send)
+            return
+
+        trigger = self._trigger(scope)
+        if trigger is None or self._active >= PROFILE_MAX_CONCURRENT:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = ProfileStore.new_id()
+        status_code = 500
+
+        async def send_with_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        coro = self.app(scope, receive, send_with_id)
+        sampler = RequestSampler(coro, PROFILE_INTERVAL_MS / 1000)
+        self._active += 1
+        sampler.start()
+        start = time.perf_counter()
+        try:
+            await coro
+        finally:
+            elapsed = time.perf_counter() - start
+            sampler.stop()
+            self._active -= 1
+
+            route = scope.get("route")
+            meta = {
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(route, "path", None),
+                "status": status_code,
+                "trigger": trigger,
+                "duration_ms": round(elapsed * 1000, 1),
+                "samples": sampler.samples,
+                "interval_ms": PROFILE_INTERVAL_MS,
+                "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            }
+            task = asyncio.create_task(self._write(profile_id, sampler.collapsed(), meta))
+            self._writes.add(task)
+            task.add_done_callback(self._writes.discard)
+
+    async def _write(self, profile_id: str, collapsed: str, meta: dict) -> None:
+        try:
+            await run_in_threadpool(profile_store.save, profile_id, collapsed, meta)
+        except OSError as e:
+            logger.warning("saving profile %s failed: %s", profile_id, e)
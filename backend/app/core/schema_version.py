@@ -0,0 +1,48 @@
+"""
+Startup check that the database schema matches the migration scripts.
+
+Migrations are applied once per release (`alembic -c backend/alembic.ini upgrade head`,
+see the Procfile), not by the app. Workers only compare the database's
+alembic_version with the script heads.
+"""
+
+import logging
+from pathlib import Path
+from typing import Set
+
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+
+from .db_config import DB_REQUIRE_CURRENT_SCHEMA
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+logger = logging.getLogger(__name__)
+
+
+def expected_heads() -> Set[str]:
+    return set(ScriptDirectory.from_config(Config(str(ALEMBIC_INI))).get_heads())
+
+
+def _current_heads(connection) -> Set[str]:
+    return set(MigrationContext.configure(connection).get_current_heads())
+
+
+async def verify_schema_version(engine) -> None:
+    """Raise (or warn, with DB_REQUIRE_CURRENT_SCHEMA=false) if migrations are pending."""
+    async with engine.connect() as conn:
+        current = await conn.run_sync(_current_heads)
+    expected = expected_heads()
+
+    if current == expected:
+        logger.info("database schema at revision %s", ", ".join(sorted(current)))
+        return
+
+    message = (
+        f"database schema revision {sorted(current) or 'none'} does not match "
+        f"migrations {sorted(expected)}; run `alembic -c backend/alembic.ini upgrade head`"
+    )
+    if DB_REQUIRE_CURRENT_SCHEMA:
+        raise RuntimeError(message)
+    logger.warning(message)
@@ -1,13 +1,85 @@
+"""
+Password hashing.
+
+pbkdf2_sha256 costs milliseconds to hundreds of milliseconds of CPU per call,
+so request handlers use the async helpers, which run it on a small dedicated
+thread pool (hashlib releases the GIL while hashing) instead of the event
+loop. At most PASSWORD_HASH_MAX_PENDING calls may wait for a thread; beyond
+that requests get 503 instead of queueing without bound.
+
+Hashes store their own round count. When PASSWORD_HASH_ROUNDS changes,
+existing hashes still verify and verify_password_async returns a fresh hash
+for the caller to save (rehash on login).
+
+Configuration (environment variables):
+- PASSWORD_HASH_ROUNDS: pbkdf2_sha256 iterations (default: 29000)
+- PASSWORD_HASH_WORKERS: hashing threads per worker process (default: min(4, CPUs))
+- PASSWORD_HASH_MAX_PENDING: hashing calls allowed to wait for a thread (default: 64)
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
+PASSWORD_HASH_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS", "29000"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
 # Use pbkdf2_sha256 (SAFE on Windows + Python 3.13)
+# min = max = default rounds, so any hash with a different cost is flagged for rehash
 pwd_context = CryptContext(
     schemes=["pbkdf2_sha256"],
-    deprecated="auto"
+    deprecated="auto",
+    pbkdf2_sha256__default_rounds=PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__min_rounds=PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__max_rounds=PASSWORD_HASH_ROUNDS,
 )
 
+_executor: Optional[ThreadPoolExecutor] = None
+_slots: Optional[asyncio.Semaphore] = None
+
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(password, hashed_password)
\ No newline at end of file
+    return pwd_context.verify(password, hashed_password)
+
+
+async def _run(func, *args):
+    global _executor, _slots
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+        _slots = asyncio.Semaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_PENDING)
+
+    if _slots.locked():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins in progress, please try again.",
+            headers={"Retry-After": "1"},
+        )
+    async with _slots:
+        return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run(pwd_context.hash, password)
+
+
+async def verify_password_async(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Returns (valid, new hash if the stored one uses outdated parameters)."""
+    return await _run(pwd_context.verify_and_update, password, hashed_password)
+
+
+def shutdown_password_hashing() -> None:
+    global _executor, _slots
+
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+        _slots = None
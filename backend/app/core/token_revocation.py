@@ -0,0 +1,138 @@
+"""
+Access token revocation list.
+
+Logout revokes the presented token; a password change revokes every token
+the user was issued before it. Revocations are written to auth.revoked_tokens
+and mirrored in memory, so checking a request costs a set and a dict lookup.
+The worker that revokes a token applies it immediately; other workers pick it
+up on their next refresh, which loads only rows created since the previous
+refresh (with an overlap for slow transactions) and also drops entries whose
+tokens have expired anyway.
+
+Configuration (environment variables):
+- TOKEN_REVOCATION_REFRESH_SECONDS: seconds between refreshes from the database (default: 10)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import delete, insert, select
+
+from .config import ACCESS_TOKEN_EXPIRE_DELTA
+
+TOKEN_REVOCATION_REFRESH_SECONDS = float(os.getenv("TOKEN_REVOCATION_REFRESH_SECONDS", "10"))
+
+# Expired rows are deleted from the table at most this often
+PRUNE_INTERVAL_SECONDS = 3600
+# Re-read rows this much older than the last refresh: created_at is the
+# inserting transaction's start, which can precede its commit
+REFRESH_OVERLAP = timedelta(seconds=60)
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationList:
+    def __init__(self, refresh_interval: float = TOKEN_REVOCATION_REFRESH_SECONDS):
+        self.refresh_interval = refresh_interval
+        self._tokens: Dict[str, float] = {}        # token hash -> token expiry (epoch seconds)
+        self._users: Dict[int, tuple] = {}         # user id -> (issued-before cutoff, expiry)
+        self._since = datetime.fromtimestamp(0, timezone.utc)
+        self._last_prune = 0.0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def is_revoked(self, token_hash: str, user_id: int, issued_at: float) -> bool:
+        if token_hash in self._tokens:
+            return True
+        cutoff = self._users.get(user_id)
+        return cutoff is not None and issued_at < cutoff[0]
+
+    def _add(self, user_id: int, token_hash: Optional[str], created_at: datetime, expires_at: datetime) -> None:
+        if token_hash is not None:
+            self._tokens[token_hash] = expires_at.timestamp()
+            return
+        cutoff = created_at.timestamp()
+        current = self._users.get(user_id)
+        if current is None or cutoff > current[0]:
+            self._users[user_id] = (cutoff, expires_at.timestamp())
+
+    async def revoke_token(self, db, user_id: int, token_hash: str, expires_at: datetime) -> None:
+        """Revoke one token (logout). Runs in the caller's transaction; applied locally right away."""
+        await db.execute(insert(self._model()).values(user_id=user_id, token_hash=token_hash, expires_at=expires_at))
+        self._add(user_id, token_hash, datetime.now(timezone.utc), expires_at)
+
+    async def revoke_user(self, db, user_id: int) -> None:
+        """Revoke every token issued to the user until now (password change)."""
+        now = datetime.now(timezone.utc)
+        expires_at = now + ACCESS_TOKEN_EXPIRE_DELTA
+        await db.execute(insert(self._model()).values(user_id=user_id, created_at=now, expires_at=expires_at))
+        self._add(user_id, None, now, expires_at)
+
+    async def refresh(self) -> int:
+        """Load revocations written since the last refresh (by any worker). Returns rows loaded."""
+        from ..database import AsyncSessionLocal
+
+        model = self._model()
+        now = datetime.now(timezone.utc)
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(model.user_id, model.token_hash, model.created_at, model.expires_at)
+                .where(model.created_at > self._since, model.expires_at > now)
+            )
+            rows = result.all()
+
+            if time.monotonic() - self._last_prune > PRUNE_INTERVAL_SECONDS:
+                await db.execute(delete(model).where(model.expires_at <= now))
+                await db.commit()
+                self._last_prune = time.monotonic()
+
+        for user_id, token_hash, created_at, expires_at in rows:
+            self._add(user_id, token_hash, created_at, expires_at)
+        self._since = now - REFRESH_OVERLAP
+
+        # Forget revocations whose tokens have expired anyway
+        cutoff = now.timestamp()
+        self._tokens = {key: exp for key, exp in self._tokens.items() if exp > cutoff}
+        self._users = {key: value for key, value in self._users.items() if value[1] > cutoff}
+        return len(rows)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopping = False
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+            self._wakeup = None
+
+    async def _run(self) -> None:
+        # The first load happens at startup, before requests are served
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+            if self._stopping:
+                break
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning("token revocation refresh failed: %s", e)
+
+    @staticmethod
+    def _model():
+        from ..models.user import RevokedToken
+        return RevokedToken
+
+
+token_revocations = RevocationList()
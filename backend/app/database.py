@@ -1,25 +1,109 @@
-import os
+import logging
+import time
+from typing import Dict, Optional
+
 from dotenv import load_dotenv
+from fastapi import Depends, Request
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 
 load_dotenv()
 
-DATABASE_URL = os.getenv("DATABASE_URL")
+from .core import db_config, metrics
+from .core.db_config import DATABASE_URL, DATABASE_READ_URL
+from .dependencies.auth import get_current_user_id
+
+logger = logging.getLogger(__name__)
+
+
+class PrimarySession(Session):
+    """Sessions bound to the primary; commits start the user's read-your-writes window."""
+
 
 engine = create_async_engine(
     DATABASE_URL,
-    echo=True
+    **db_config.engine_options()
 )
 
+metrics.instrument_engine(engine)
+
 AsyncSessionLocal = sessionmaker(
     engine,
     class_=AsyncSession,
+    sync_session_class=PrimarySession,
     expire_on_commit=False
 )
 
+# Read replica (optional). Without DATABASE_READ_URL reads use the primary.
+read_engine = create_async_engine(
+    DATABASE_READ_URL,
+    **db_config.engine_options()
+) if DATABASE_READ_URL else None
+
+if read_engine is not None:
+    metrics.instrument_engine(read_engine)
+
+ReadSessionLocal = sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+) if read_engine is not None else None
+
 Base = declarative_base()
 
-async def get_db():
+# user id -> monotonic time until which that user's reads go to the primary
+_recent_writers: Dict[int, float] = {}
+_replica_down_until = 0.0
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def _record_write(session: Session) -> None:
+    request: Optional[Request] = session.info.get("request")
+    user_id = getattr(request.state, "user_id", None) if request is not None else None
+    if user_id is None or db_config.DB_READ_YOUR_WRITES_SECONDS <= 0:
+        return
+
+    now = time.monotonic()
+    if len(_recent_writers) > 10000:
+        for uid, until in list(_recent_writers.items()):
+            if until < now:
+                del _recent_writers[uid]
+    _recent_writers[user_id] = now + db_config.DB_READ_YOUR_WRITES_SECONDS
+
+
+def _use_primary_for(user_id: int) -> bool:
+    if ReadSessionLocal is None or time.monotonic() < _replica_down_until:
+        return True
+    return _recent_writers.get(user_id, 0.0) > time.monotonic()
+
+
+async def get_db(request: Request):
+    async with AsyncSessionLocal() as session:
+        session.info["request"] = request
+        yield session
+
+
+async def get_read_db(user_id: int = Depends(get_current_user_id)):
+    """
+    Session for read-only routes. Uses the replica unless the user wrote within
+    the read-your-writes window, or the replica recently failed to connect.
+    """
+    global _replica_down_until
+
+    if not _use_primary_for(user_id):
+        async with ReadSessionLocal() as session:
+            try:
+                await session.connection()
+                replica_ok = True
+            except Exception as e:
+                replica_ok = False
+                _replica_down_until = time.monotonic() + db_config.DB_REPLICA_RETRY_SECONDS
+                logger.warning("read replica unavailable, using primary: %s", e)
+
+            if replica_ok:
+                yield session
+                return
+
     async with AsyncSessionLocal() as session:
         yield session
@@ -1,22 +1,42 @@
-from fastapi import Depends, HTTPException, status
+"""
+Bearer token authentication.
+
+Verified tokens are cached by SHA-256 hash until they expire, so repeat
+requests skip JWT decoding and signature checks. Every request, cached or
+not, is checked against the in-memory revocation list (logout, password
+change).
+
+Configuration (environment variables):
+- TOKEN_CACHE_SIZE: verified tokens kept per worker (default: 10000)
+"""
+
+import hashlib
+import os
+import time
+
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from ..core.config import SECRET_KEY, ALGORITHM
+from ..core.cache import TTLCache
+from ..core.token_revocation import token_revocations
+
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
 
 security = HTTPBearer(auto_error=False)
 
-def get_current_user_id(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-) -> int:
-    # Gracefully handle missing credentials to return user-friendly 401 instead of 500
-    if credentials is None or credentials.credentials is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Please sign in to continue.",
-        )
+# token hash -> (user id, issued at, expires at); each entry lives until its token expires
+token_cache = TTLCache(TOKEN_CACHE_SIZE, ttl=float("inf"))
 
-    token = credentials.credentials
 
+def _session_expired() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Session expired. Please sign in again.",
+    )
+
+
+def _verify(token: str, token_hash: str) -> tuple:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id = payload.get("sub")
@@ -27,10 +47,40 @@ def get_current_user_id(
                 detail="Please sign in to continue.",
             )
 
-        return int(payload["sub"]) 
+        claims = (int(user_id), float(payload.get("iat", 0)), payload.get("exp"))
+    except (JWTError, ValueError, TypeError):
+        raise _session_expired()
+
+    if claims[2] is not None:
+        token_cache.set(token_hash, claims, ttl=claims[2] - time.time())
+    return claims
+
 
-    except (JWTError, ValueError):
+async def get_current_user_id(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> int:
+    # Gracefully handle missing credentials to return user-friendly 401 instead of 500
+    if credentials is None or credentials.credentials is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Session expired. Please sign in again.",
+            detail="Please sign in to continue.",
         )
+
+    token = credentials.credentials
+    token_hash = hashlib.sha256(token.encode()).hexdigest()
+
+    claims = token_cache.get(token_hash)
+    if claims is None:
+        claims = _verify(token, token_hash)
+
+    user_id, issued_at, expires_at = claims
+    if token_revocations.is_revoked(token_hash, user_id, issued_at):
+        raise _session_expired()
+
+    # Lets the database layer attribute commits to this user (read-your-writes),
+    # and logout revoke the presented token
+    request.state.user_id = user_id
+    request.state.token_hash = token_hash
+    request.state.token_expires_at = expires_at
+    return user_id
@@ -0,0 +1,98 @@
+"""
+Keyset (cursor) pagination for per-user list routes.
+
+Lists are ordered newest first by (sort column, id). A page's last row is
+encoded into an opaque cursor, and the next page continues strictly after it
+with a row comparison the composite (user_id, sort column, id) indexes can
+answer directly, so deep pages cost the same as the first one.
+
+Sort columns are nullable. PostgreSQL sorts NULLs first in descending order
+(the same order as a backward scan of those indexes), so rows without a sort
+value come first, by id, and a cursor taken among them continues with the
+rest of the NULL rows followed by every row that has a value.
+
+The response body stays a JSON array; paging metadata travels in headers:
+- X-Next-Cursor: pass back as `cursor` to get the next page (absent on the last page)
+- X-Total-Count: total rows, only when `include_total=true` (costs an extra COUNT)
+
+Without `limit` the full list is returned, as before.
+
+Configuration (environment variables):
+- PAGE_MAX_LIMIT: largest accepted `limit` (default: 500)
+"""
+
+import base64
+import json
+import os
+from datetime import date, datetime
+from typing import Optional
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import and_, func, or_, select, tuple_
+
+PAGE_MAX_LIMIT = int(os.getenv("PAGE_MAX_LIMIT", "500"))
+
+
+class PageParams:
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, le=PAGE_MAX_LIMIT, description="Page size"),
+        cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+        include_total: bool = Query(False, description="Return X-Total-Count"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.include_total = include_total
+
+
+def encode_cursor(value, row_id: int) -> str:
+    """Cursor for the row after (value, row_id); value may be None."""
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    raw = json.dumps([value, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, column) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, row_id = json.loads(raw)
+        python_type = column.type.python_type
+        if value is not None and python_type in (date, datetime):
+            value = python_type.fromisoformat(value)
+        return value, int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def paginate(db, query, params: PageParams, response: Response, order_column, id_column) -> list:
+    """Run `query` (already filtered to the user) as one newest-first page."""
+    if params.include_total:
+        total = await db.execute(select(func.count()).select_from(query.order_by(None).subquery()))
+        response.headers["X-Total-Count"] = str(total.scalar_one())
+
+    if params.cursor:
+        value, row_id = decode_cursor(params.cursor, order_column)
+        if value is None:
+            # Still among the NULL rows (sorted first): the rest of them, then all dated rows
+            query = query.where(or_(
+                and_(order_column.is_(None), id_column < row_id),
+                order_column.isnot(None),
+            ))
+        else:
+            # NULL rows sorted first and are already behind us; the comparison excludes them
+            query = query.where(tuple_(order_column, id_column) < tuple_(value, row_id))
+
+    query = query.order_by(order_column.desc().nulls_first(), id_column.desc())
+    if params.limit is not None:
+        # One extra row tells us whether another page exists
+        query = query.limit(params.limit + 1)
+
+    rows = (await db.execute(query)).scalars().all()
+
+    if params.limit is not None and len(rows) > params.limit:
+        rows = rows[:params.limit]
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(getattr(last, order_column.key), last.id)
+
+    return rows
@@ -0,0 +1,190 @@
+"""
+Sliding-window rate limiting.
+
+Each limiter allows `limit` requests per `window` seconds for a key (client
+IP, email, user id). Counts are kept per fixed window, and a request is
+admitted while the previous window's count, weighted by how much of it still
+overlaps the sliding window, plus the current window's count stays within the
+limit. That needs two counters per key instead of a timestamp per request.
+Rejected requests are not counted and get 429 with Retry-After set to when
+the next one would be admitted.
+
+Counters live in this worker's memory by default, so with N workers a client
+gets up to N times the limit. Set RATE_LIMIT_REDIS_URL (requires the `redis`
+package) to share them between workers; if Redis is unreachable, limiting
+falls back to per-worker counters rather than failing requests.
+
+Client IPs come from the connection. Behind a reverse proxy, run uvicorn with
+--proxy-headers and --forwarded-allow-ips so they reflect X-Forwarded-For.
+
+Limits are "<requests>/<seconds>", "0" disables a limiter.
+
+Configuration (environment variables):
+- RATE_LIMIT_LOGIN_IP: login attempts per client IP (default: 20/60)
+- RATE_LIMIT_LOGIN_EMAIL: login attempts per email address (default: 5/60)
+- RATE_LIMIT_SIGNUP_IP: signups per client IP (default: 10/3600)
+- RATE_LIMIT_AI_USER: /ai/chat, /ai/rag-chat and /ai/ocr-with-rag requests per user (default: 30/60)
+- RATE_LIMIT_REDIS_URL: share counters through Redis, e.g. redis://localhost:6379/0 (default: unset)
+- RATE_LIMIT_MAX_KEYS: keys tracked per worker by the in-process store (default: 100000)
+"""
+
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Callable, Tuple
+
+from fastapi import Depends, HTTPException, Request, status
+
+from .auth import get_current_user_id
+
+RATE_LIMIT_LOGIN_IP = os.getenv("RATE_LIMIT_LOGIN_IP", "20/60")
+RATE_LIMIT_LOGIN_EMAIL = os.getenv("RATE_LIMIT_LOGIN_EMAIL", "5/60")
+RATE_LIMIT_SIGNUP_IP = os.getenv("RATE_LIMIT_SIGNUP_IP", "10/3600")
+RATE_LIMIT_AI_USER = os.getenv("RATE_LIMIT_AI_USER", "30/60")
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", "")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+logger = logging.getLogger(__name__)
+
+
+class LocalCounters:
+    """Per-window counters in this worker's memory, least recently used keys evicted first."""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        # key -> [window index, count in that window, count in the window before]
+        self._windows: "OrderedDict[str, list]" = OrderedDict()
+
+    async def incr(self, key: str, index: int, window: float) -> Tuple[int, int]:
+        """Count one request in window `index`. Returns (previous window count, current count)."""
+        entry = self._windows.get(key)
+        if entry is None or entry[0] < index - 1:
+            entry = [index, 0, 0]
+        elif entry[0] == index - 1:
+            entry = [index, 0, entry[1]]
+        entry[1] += 1
+        self._windows[key] = entry
+        self._windows.move_to_end(key)
+        while len(self._windows) > self.max_keys:
+            self._windows.popitem(last=False)
+        return entry[2], entry[1]
+
+    async def decr(self, key: str, index: int) -> None:
+        entry = self._windows.get(key)
+        if entry is not None and entry[0] == index:
+            entry[1] -= 1
+
+    def clear(self) -> None:
+        self._windows.clear()
+
+
+class RedisCounters:
+    """Per-window counters in Redis, shared by every worker. Keys expire after two windows."""
+
+    def __init__(self, url: str, prefix: str = "ratelimit"):
+        try:
+            import redis.asyncio as redis  # type: ignore
+        except ImportError:
+            raise RuntimeError("RATE_LIMIT_REDIS_URL is set but the redis package is not installed")
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+    async def incr(self, key: str, index: int, window: float) -> Tuple[int, int]:
+        current_key = f"{self.prefix}:{key}:{index}"
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.incr(current_key)
+            pipe.expire(current_key, math.ceil(window * 2))
+            pipe.get(f"{self.prefix}:{key}:{index - 1}")
+            current, _, previous = await pipe.execute()
+        return int(previous or 0), int(current)
+
+    async def decr(self, key: str, index: int) -> None:
+        await self._client.decr(f"{self.prefix}:{key}:{index}")
+
+
+local_counters = LocalCounters()
+shared_counters = RedisCounters(RATE_LIMIT_REDIS_URL) if RATE_LIMIT_REDIS_URL else None
+
+
+def parse_limit(spec: str) -> Tuple[int, float]:
+    """'20/60' -> (20, 60.0); '0' -> (0, 0.0), which disables the limiter."""
+    if spec.strip() in ("", "0"):
+        return 0, 0.0
+    count, _, seconds = spec.partition("/")
+    return int(count), float(seconds)
+
+
+def _retry_after(previous: int, current: int, elapsed: float, limit: int, window: float) -> float:
+    """Seconds until one more request fits, given the counts of the previous and current window."""
+    if current < limit and previous > 0:
+        # Still in this window, once enough of the previous one has slid out
+        return (1 - (limit - 1 - current) / previous) * window - elapsed
+    # In the next window, once enough of this one has slid out
+    return window - elapsed + max(0.0, 1 - (limit - 1) / current) * window
+
+
+class SlidingWindowLimiter:
+    def __init__(self, name: str, spec: str):
+        self.name = name
+        self.limit, self.window = parse_limit(spec)
+        self.rejected = 0
+
+    async def hit(self, key: str) -> None:
+        """Count a request for `key`, or raise 429 if it would exceed the limit."""
+        if self.limit <= 0:
+            return
+
+        counters_key = f"{self.name}:{key}"
+        index, elapsed = divmod(time.time(), self.window)
+        index = int(index)
+
+        counters = shared_counters or local_counters
+        try:
+            previous, current = await counters.incr(counters_key, index, self.window)
+        except Exception as e:
+            logger.warning("rate limit store unavailable, using per-worker counters: %s", e)
+            counters = local_counters
+            previous, current = await counters.incr(counters_key, index, self.window)
+
+        if previous * (1 - elapsed / self.window) + current <= self.limit:
+            return
+
+        try:
+            await counters.decr(counters_key, index)
+        except Exception as e:
+            logger.warning("rate limit store unavailable: %s", e)
+        self.rejected += 1
+
+        retry_after = max(1, math.ceil(_retry_after(previous, current - 1, elapsed, self.limit, self.window)))
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Too many requests. Please try again in {retry_after} seconds.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+login_ip_limiter = SlidingWindowLimiter("login-ip", RATE_LIMIT_LOGIN_IP)
+login_email_limiter = SlidingWindowLimiter("login-email", RATE_LIMIT_LOGIN_EMAIL)
+signup_ip_limiter = SlidingWindowLimiter("signup-ip", RATE_LIMIT_SIGNUP_IP)
+ai_limiter = SlidingWindowLimiter("ai-user", RATE_LIMIT_AI_USER)
+
+
+async def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+async def current_user(user_id: int = Depends(get_current_user_id)) -> str:
+    return str(user_id)
+
+
+def rate_limit(limiter: SlidingWindowLimiter, key: Callable = client_ip):
+    """
+    Dependency that counts the request against `limiter`, keyed by the
+    result of the `key` dependency (client IP by default, or `current_user`).
+    """
+    async def check(value: str = Depends(key)) -> None:
+        await limiter.hit(value)
+
+    return check
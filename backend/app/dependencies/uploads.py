@@ -0,0 +1,261 @@
+"""
+Streaming image upload dependency.
+
+The multipart body is parsed as it arrives instead of being buffered first:
+- the size limit is enforced while bytes are received (413 as soon as it is crossed)
+- the file type is sniffed from its magic bytes before the rest is read (415)
+- small files stay in memory, larger ones are spooled to a temp file
+
+Routes hand `upload.source` (a memoryview or a file path) to the OCR worker.
+
+Configuration (environment variables):
+- UPLOAD_MAX_BYTES: maximum file size (default: 10MB)
+- UPLOAD_SPOOL_BYTES: in-memory threshold before spooling to disk (default: 1MB)
+"""
+
+import os
+import tempfile
+from typing import AsyncIterator, Optional, Union
+
+from fastapi import HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:
+    from multipart.multipart import MultipartParser, parse_options_header  # type: ignore
+
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_SPOOL_BYTES = int(os.getenv("UPLOAD_SPOOL_BYTES", str(1024 * 1024)))
+
+# Allowance for multipart boundaries and part headers when checking Content-Length
+MULTIPART_OVERHEAD = 64 * 1024
+
+# Magic byte prefixes of accepted image formats
+IMAGE_SIGNATURES = {
+    b"\xff\xd8\xff": "image/jpeg",
+    b"\x89PNG\r\n\x1a\n": "image/png",
+    b"BM": "image/bmp",
+    b"II*\x00": "image/tiff",
+    b"MM\x00*": "image/tiff",
+}
+
+# Multi-page documents additionally accepted where allowed
+DOCUMENT_SIGNATURES = {
+    **IMAGE_SIGNATURES,
+    b"%PDF-": "application/pdf",
+}
+
+SNIFF_BYTES = 16
+
+
+def sniff_content_type(head: bytes, signatures: dict = IMAGE_SIGNATURES) -> Optional[str]:
+    """Detect the file type from its first bytes."""
+    for signature, content_type in signatures.items():
+        if head.startswith(signature):
+            return content_type
+    return None
+
+
+class UploadedFile:
+    """An uploaded file held in memory until it grows past UPLOAD_SPOOL_BYTES, then spooled to disk."""
+
+    def __init__(
+        self,
+        filename: str,
+        signatures: dict = IMAGE_SIGNATURES,
+        max_bytes: int = UPLOAD_MAX_BYTES,
+        spool_bytes: int = UPLOAD_SPOOL_BYTES,
+    ):
+        self.filename = filename
+        self.signatures = signatures
+        self.content_type: Optional[str] = None
+        self.size = 0
+        self.max_bytes = max_bytes
+        self.spool_bytes = spool_bytes
+        self._head = bytearray()
+        self._buffer = bytearray()
+        self._pending: list = []
+        self._file = None
+        self.detached = False
+
+    def feed(self, data: bytes) -> None:
+        """Accept a chunk from the parser, enforcing the size limit and sniffing the type."""
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File size is too large. Please choose a smaller image (max {self.max_bytes // (1024 * 1024)}MB).",
+            )
+
+        if self.content_type is None and len(self._head) < SNIFF_BYTES:
+            self._head.extend(data[:SNIFF_BYTES - len(self._head)])
+            if len(self._head) >= SNIFF_BYTES:
+                self._check_type()
+
+        self._pending.append(data)
+
+    async def flush(self) -> None:
+        """Move pending chunks into memory, or onto disk once past the spool threshold."""
+        if not self._pending:
+            return
+
+        chunks, self._pending = self._pending, []
+        if self._file is None and self.size <= self.spool_bytes:
+            for chunk in chunks:
+                self._buffer.extend(chunk)
+            return
+
+        await run_in_threadpool(self._write_to_disk, chunks)
+
+    def _write_to_disk(self, chunks: list) -> None:
+        if self._file is None:
+            self._file = tempfile.NamedTemporaryFile(prefix="upload-", delete=False)
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+        for chunk in chunks:
+            self._file.write(chunk)
+
+    async def finish(self) -> None:
+        await self.flush()
+        if self._file is not None:
+            await run_in_threadpool(self._file.flush)
+        if self.content_type is None:
+            self._check_type()
+
+    def _check_type(self) -> None:
+        self.content_type = sniff_content_type(bytes(self._head), self.signatures)
+        if self.content_type is None:
+            accepted = "a JPG, PNG, BMP or TIFF image"
+            if "application/pdf" in self.signatures.values():
+                accepted += " or a PDF document"
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail=f"Unsupported file type. Please upload {accepted}.",
+            )
+
+    @property
+    def source(self) -> Union[memoryview, str]:
+        """File path if spooled to disk, otherwise a zero-copy view of the in-memory data."""
+        if self._file is not None:
+            return self._file.name
+        return memoryview(self._buffer)
+
+    def detach(self) -> "UploadedFile":
+        """
+        Take over cleanup from the dependency, e.g. when the file is read by a
+        streaming response after the endpoint returns. The caller must close() it.
+        """
+        self.detached = True
+        return self
+
+    def close(self) -> None:
+        self._buffer = bytearray()
+        if self._file is not None:
+            self._file.close()
+            try:
+                os.unlink(self._file.name)
+            except OSError:
+                pass
+            self._file = None
+
+
+async def _receive_upload(request: Request, boundary: bytes, field_name: str, signatures: dict) -> Optional[UploadedFile]:
+    state = {"upload": None, "target": None, "header_field": b"", "header_value": b"", "headers": {}}
+
+    def on_part_begin():
+        state["headers"] = {}
+
+    def on_header_field(data, start, end):
+        state["header_field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        state["header_value"] += data[start:end]
+
+    def on_header_end():
+        state["headers"][state["header_field"].lower()] = state["header_value"]
+        state["header_field"] = b""
+        state["header_value"] = b""
+
+    def on_headers_finished():
+        _, options = parse_options_header(state["headers"].get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("latin-1")
+        filename = options.get(b"filename")
+        if state["upload"] is None and filename is not None and name == field_name:
+            state["upload"] = UploadedFile(filename.decode("utf-8", "replace"), signatures)
+            state["target"] = state["upload"]
+
+    def on_part_data(data, start, end):
+        if state["target"] is not None:
+            state["target"].feed(data[start:end])
+
+    def on_part_end():
+        state["target"] = None
+
+    parser = MultipartParser(
+        boundary,
+        {
+            "on_part_begin": on_part_begin,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+            "on_part_data": on_part_data,
+            "on_part_end": on_part_end,
+        },
+    )
+
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            if state["upload"] is not None:
+                await state["upload"].flush()
+        parser.finalize()
+
+        if state["upload"] is not None:
+            await state["upload"].finish()
+    except BaseException:
+        if state["upload"] is not None:
+            await run_in_threadpool(state["upload"].close)
+        raise
+
+    return state["upload"]
+
+
+def image_upload(field_name: str = "file", allow_documents: bool = False):
+    """
+    Build a dependency that streams a multipart image upload.
+    With allow_documents=True, PDF files are accepted as well.
+    Usage: `upload: UploadedFile = Depends(image_upload())`
+    """
+    signatures = DOCUMENT_SIGNATURES if allow_documents else IMAGE_SIGNATURES
+
+    async def dependency(request: Request) -> AsyncIterator[UploadedFile]:
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > UPLOAD_MAX_BYTES + MULTIPART_OVERHEAD:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File size is too large. Please choose a smaller image (max {UPLOAD_MAX_BYTES // (1024 * 1024)}MB).",
+            )
+
+        content_type, options = parse_options_header(request.headers.get("content-type", ""))
+        if content_type != b"multipart/form-data" or b"boundary" not in options:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Please upload an image file.",
+            )
+
+        upload = await _receive_upload(request, options[b"boundary"], field_name, signatures)
+        if upload is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Please upload an image file.",
+            )
+
+        try:
+            yield upload
+        finally:
+            if not upload.detached:
+                await run_in_threadpool(upload.close)
+
+    return dependency
@@ -1,15 +1,27 @@
+import logging
 import os
 from dotenv import load_dotenv
 load_dotenv()
 
-from fastapi import FastAPI
+from .core.logging_config import setup_logging
+setup_logging()
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import text
 
 from .rag.pipeline import initialize_rag
-from .database import engine, Base
-from .routes import auth, users, todo, emergency_contact, ai_assistant, planner, expense, trip
+from .database import engine, AsyncSessionLocal
+from .core import db_config, metrics, profiling
+from .core.schema_version import verify_schema_version
+from .core.audit import expense_audit
+from .core.security import shutdown_password_hashing
+from .core.token_revocation import token_revocations
+from .ocr.vendor_index import load_expense_vendors
+from .routes import auth, users, todo, emergency_contact, ai_assistant, planner, expense, trip, images, profiles
+
 
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Travista Backend")
 
@@ -19,43 +31,84 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination metadata for keyset-paginated list routes, and when to retry a 429
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "Retry-After"],
 )
 
+# Opt-in per-request profiling (X-Profile-Token header or PROFILE_SAMPLE_RATE)
+app.add_middleware(profiling.ProfilingMiddleware)
+
+# API routers, included below
+ROUTERS = [
+    auth.router,
+    users.router,
+    todo.router,
+    emergency_contact.router,
+    ai_assistant.router,
+    planner.router,
+    expense.router,
+    trip.router,
+    images.router,
+    profiles.router,
+]
+
+# Outermost, so latency includes every other middleware
+app.add_middleware(metrics.MetricsMiddleware, prefixes=[router.prefix for router in ROUTERS])
+
 
 @app.on_event("startup")
 async def startup():
-    async with engine.begin() as conn:
-        # Create required schemas
-        await conn.execute(text("CREATE SCHEMA IF NOT EXISTS auth"))
-        await conn.execute(text("CREATE SCHEMA IF NOT EXISTS trip"))
-        await conn.execute(text("CREATE SCHEMA IF NOT EXISTS todo"))
-        await conn.execute(text("CREATE SCHEMA IF NOT EXISTS emergency"))
-        await conn.execute(text("CREATE SCHEMA IF NOT EXISTS budget"))
+    logger.info("database config", extra=db_config.describe())
+
+    # Migrations run in the release step; workers only check the version
+    await verify_schema_version(engine)
 
-        # Create tables based on SQLAlchemy models
-        await conn.run_sync(Base.metadata.create_all)
+    expense_audit.start()
+
+    # Load revoked tokens before serving, then poll for new revocations
+    try:
+        await token_revocations.refresh()
+    except Exception as e:
+        logger.warning("token revocation list load failed: %s", e)
+    token_revocations.start()
+
+    # Extend the receipt vendor directory with places from saved expenses
+    try:
+        async with AsyncSessionLocal() as session:
+            loaded = await load_expense_vendors(session)
+        logger.info("vendor index loaded %d vendors from expenses", loaded)
+    except Exception as e:
+        logger.warning("vendor index load skipped: %s", e)
 
     # Initialize RAG (if enabled)
     if os.getenv("ENABLE_RAG", "true").lower() == "true":
         try:
             initialize_rag("rag/data")
         except Exception as e:
-            print(f"⚠ RAG initialization skipped: {e}")
+            logger.warning("RAG initialization skipped: %s", e)
     else:
-        print("ℹ RAG initialization disabled via ENABLE_RAG=false")
+        logger.info("RAG initialization disabled via ENABLE_RAG=false")
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await expense_audit.stop()
+    await token_revocations.stop()
+    shutdown_password_hashing()
 
 
 # Include API routes
-app.include_router(auth.router)
-app.include_router(users.router)
-app.include_router(todo.router)
-app.include_router(emergency_contact.router)
-app.include_router(ai_assistant.router)
-app.include_router(planner.router)
-app.include_router(expense.router)
-app.include_router(trip.router)
+for router in ROUTERS:
+    app.include_router(router)
 
 
 @app.get("/")
 async def root():
     return {"status": "Backend running"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics(request: Request):
+    if metrics.METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {metrics.METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    return Response(metrics.render_metrics(), media_type=metrics.CONTENT_TYPE)
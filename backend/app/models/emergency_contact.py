@@ -8,7 +8,7 @@ class EmergencyContact(Base):
     __table_args__ = {"schema": "emergency"}
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("auth.users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("auth.users.id"), nullable=False, index=True)
 
     name = Column(String(100), nullable=False)
     phone = Column(String(20), nullable=False)
@@ -1,10 +1,16 @@
-from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, Index, PrimaryKeyConstraint
 from sqlalchemy.sql import func
 from ..database import Base
 
 class Expense(Base):
     __tablename__ = "expenses"
-    __table_args__ = {"schema": "budget"}
+    __table_args__ = (
+        # get_expenses: user + trip, newest first
+        Index("ix_budget_expenses_user_trip_date", "user_id", "trip_id", "date", "id"),
+        # get_all_expenses: user, newest first
+        Index("ix_budget_expenses_user_date", "user_id", "date", "id"),
+        {"schema": "budget"},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -25,3 +31,35 @@ class Expense(Base):
     category = Column(String, nullable=False)
     date = Column(Date, server_default=func.current_date())
     source = Column(String, default="manual")
+
+
+class TripRollup(Base):
+    """
+    Running expense totals per trip, kept in step with budget.expenses.
+    One row per (trip, owner, dimension, key):
+    - dimension "trip", key "": the trip total
+    - dimension "category", key: category name
+    - dimension "day", key: ISO date
+    """
+    __tablename__ = "trip_rollups"
+    __table_args__ = (
+        PrimaryKeyConstraint("trip_id", "user_id", "dimension", "key"),
+        {"schema": "budget"},
+    )
+
+    trip_id = Column(
+        Integer,
+        ForeignKey("trip.trips.id", ondelete="CASCADE"),
+        nullable=False
+    )
+
+    user_id = Column(
+        Integer,
+        ForeignKey("auth.users.id", ondelete="CASCADE"),
+        nullable=False
+    )
+
+    dimension = Column(String(16), nullable=False)
+    key = Column(String, nullable=False)
+    total = Column(Float, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Text, text
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, String, Text, text
+from sqlalchemy.dialects.postgresql import JSONB
 from ..database import Base
 
 class ProfilePicture(Base):
@@ -6,7 +7,11 @@ class ProfilePicture(Base):
     __table_args__ = {"schema": "auth"}
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("auth.users.id", ondelete="CASCADE"), nullable=False, index=True)
-    # Store full data URLs; base64 strings exceed 500 chars
-    image_url = Column(Text, nullable=False)
+    # One picture per user (replaced by upsert)
+    user_id = Column(Integer, ForeignKey("auth.users.id", ondelete="CASCADE"), nullable=False, index=True, unique=True)
+    # Blob store keys of the picture and its thumbnails ({"64": key, ...}), served by /images/{key}
+    image_key = Column(String(80), nullable=True, index=True)
+    thumbnails = Column(JSONB, nullable=True)
+    # Legacy data URLs (until backfilled) or external image URLs
+    image_url = Column(Text, nullable=True)
     created_at = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"))
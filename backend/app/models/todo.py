@@ -1,5 +1,5 @@
 from sqlalchemy import (
-    Column, Integer, String, Boolean, ForeignKey, DateTime
+    Column, Integer, String, Boolean, ForeignKey, DateTime, Index
 )
 from sqlalchemy.sql import func
 from ..database import Base
@@ -7,7 +7,10 @@ from ..database import Base
 
 class Todo(Base):
     __tablename__ = "todos"
-    __table_args__ = {"schema": "todo"}
+    __table_args__ = (
+        Index("ix_todo_todos_user_created", "user_id", "created_at", "id"),
+        {"schema": "todo"},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("auth.users.id"), nullable=False)
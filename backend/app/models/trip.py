@@ -1,5 +1,6 @@
-from sqlalchemy import Column, String, Integer, Numeric, ForeignKey, Date, Text
+from sqlalchemy import Column, String, Integer, Numeric, ForeignKey, Date, Text, Index
 from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import column_property
 from sqlalchemy.sql import func
 from sqlalchemy.types import DateTime
 
@@ -7,7 +8,11 @@ from ..database import Base
 
 class Trip(Base):
     __tablename__ = "trips"
-    __table_args__ = {"schema": "trip"}
+    __table_args__ = (
+        # Latest trip per user (active trip, upsert) and past trips listing
+        Index("ix_trip_trips_user_created", "user_id", "created_at", "id"),
+        {"schema": "trip"},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(
@@ -24,6 +29,9 @@ class Trip(Base):
     trip_styles = Column(ARRAY(String), default=[])
     start_date = Column(Date, nullable=True)
     end_date = Column(Date, nullable=True)
+    # Full AI itinerary (often many KB). List routes defer it and read
+    # has_itinerary instead; IS NOT NULL does not detoast the value.
     itinerary = Column(Text, nullable=True)
+    has_itinerary = column_property(itinerary.isnot(None))
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
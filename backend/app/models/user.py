@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, text
+from sqlalchemy import BigInteger, Column, ForeignKey, Integer, String, Boolean, DateTime, text
 from ..database import Base
 
 class User(Base):
@@ -11,3 +11,19 @@ class User(Base):
     password_hash = Column(String, nullable=False)
     is_active = Column(Boolean, server_default=text("true"))
     created_at = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"))
+
+
+class RevokedToken(Base):
+    """
+    A revoked access token (token_hash set), or all of a user's tokens
+    issued before created_at (token_hash NULL). Rows can be deleted once
+    expires_at has passed, as the tokens they cover have expired anyway.
+    """
+    __tablename__ = "revoked_tokens"
+    __table_args__ = {"schema": "auth"}
+
+    id = Column(BigInteger, primary_key=True)
+    user_id = Column(Integer, ForeignKey("auth.users.id", ondelete="CASCADE"), nullable=False)
+    token_hash = Column(String(64), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=text("CURRENT_TIMESTAMP"))
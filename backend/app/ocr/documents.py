@@ -0,0 +1,85 @@
+"""
+Multi-page document support for OCR.
+Opens PDFs (via pypdfium2) and multi-frame images such as TIFF (via Pillow)
+and renders one page at a time, so memory stays bounded to the pages being
+OCR'd regardless of document length.
+
+Configuration (environment variables):
+- OCR_PDF_DPI: rasterization resolution for PDF pages (default: 200)
+"""
+
+import io
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Union
+
+from PIL import Image  # type: ignore
+
+OCR_PDF_DPI = int(os.getenv("OCR_PDF_DPI", "200"))
+
+# PDFium is not thread-safe: every call into it must be serialized
+_pdfium_lock = threading.Lock()
+
+
+class PageDocument(ABC):
+    """A document whose pages are rendered on demand. render() is safe to call from any worker."""
+
+    page_count = 0
+
+    @abstractmethod
+    def render(self, index: int) -> Image.Image:
+        """Page `index` (0-based) as an image."""
+
+    def close(self) -> None:
+        pass
+
+
+class PdfPages(PageDocument):
+    """PDF document rasterized page by page with PDFium."""
+
+    def __init__(self, source: Union[bytes, memoryview, str], dpi: int = OCR_PDF_DPI):
+        import pypdfium2 as pdfium  # type: ignore
+
+        self.scale = dpi / 72
+        with _pdfium_lock:
+            self._pdf = pdfium.PdfDocument(source if isinstance(source, str) else bytes(source))
+            self.page_count = len(self._pdf)
+
+    def render(self, index: int) -> Image.Image:
+        with _pdfium_lock:
+            page = self._pdf[index]
+            try:
+                bitmap = page.render(scale=self.scale, grayscale=True)
+                return bitmap.to_pil()
+            finally:
+                page.close()
+
+    def close(self) -> None:
+        with _pdfium_lock:
+            self._pdf.close()
+
+
+class ImagePages(PageDocument):
+    """Single or multi-frame image (e.g. TIFF); frames are decoded one at a time."""
+
+    def __init__(self, source: Union[bytes, memoryview, str]):
+        self._lock = threading.Lock()
+        self._image = Image.open(source if isinstance(source, str) else io.BytesIO(source))
+        self.page_count = getattr(self._image, "n_frames", 1)
+
+    def render(self, index: int) -> Image.Image:
+        # Frames share one decoder; copy() detaches the page so OCR can run outside the lock
+        with self._lock:
+            self._image.seek(index)
+            return self._image.copy()
+
+    def close(self) -> None:
+        self._image.close()
+
+
+def open_document(source: Union[bytes, memoryview, str], content_type: str) -> PageDocument:
+    """Open an uploaded file as a paged document based on its sniffed content type."""
+    if content_type == "application/pdf":
+        return PdfPages(source)
+    return ImagePages(source)
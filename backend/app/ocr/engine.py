@@ -0,0 +1,134 @@
+"""
+OCR engine backends for Travista.
+
+Two backends are available:
+- tesserocr: keeps an initialized Tesseract API in-process, one per worker
+  thread, so traineddata is loaded once instead of on every call.
+- pytesseract: forks the `tesseract` binary for every call (fallback).
+
+Configuration (environment variables):
+- OCR_ENGINE: "auto" (default), "tesserocr" or "pytesseract"
+- TESSERACT_CMD: path to the tesseract binary (defaults to `tesseract` on PATH)
+- TESSDATA_PREFIX: directory holding *.traineddata files (tesserocr)
+"""
+
+import os
+import shutil
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image  # type: ignore
+
+
+OCR_ENGINE = os.getenv("OCR_ENGINE", "auto").lower()
+TESSERACT_CMD = os.getenv("TESSERACT_CMD") or shutil.which("tesseract")
+TESSDATA_PREFIX = os.getenv("TESSDATA_PREFIX")
+
+
+class OCREngine(ABC):
+    """Base class for OCR backends."""
+
+    name = "base"
+
+    @abstractmethod
+    def recognize(self, image: Image.Image, lang: str = "eng", psm: int = 6) -> Tuple[str, List[int]]:
+        """
+        Run OCR on a single image.
+
+        Returns:
+            Tuple of (extracted text, list of per-word confidences 0-100)
+        """
+
+
+class PytesseractEngine(OCREngine):
+    """Subprocess backend: one `tesseract` process per call."""
+
+    name = "pytesseract"
+
+    def __init__(self):
+        import pytesseract  # type: ignore
+
+        if TESSERACT_CMD:
+            pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+        self._pytesseract = pytesseract
+
+    def recognize(self, image: Image.Image, lang: str = "eng", psm: int = 6) -> Tuple[str, List[int]]:
+        config = f"--psm {psm}"
+        text = self._pytesseract.image_to_string(image, lang=lang, config=config)
+        data = self._pytesseract.image_to_data(image, output_type="dict", lang=lang, config=config)
+        confidences = [int(float(conf)) for conf in data["conf"] if int(float(conf)) > 0]
+        return text, confidences
+
+
+class TesserocrEngine(OCREngine):
+    """In-process backend: keeps one initialized Tesseract API per language."""
+
+    name = "tesserocr"
+
+    def __init__(self):
+        import tesserocr  # type: ignore
+
+        self._tesserocr = tesserocr
+        self._apis: Dict[str, object] = {}
+
+    def _get_api(self, lang: str):
+        api = self._apis.get(lang)
+        if api is None:
+            kwargs = {"lang": lang}
+            if TESSDATA_PREFIX:
+                kwargs["path"] = TESSDATA_PREFIX
+            api = self._tesserocr.PyTessBaseAPI(**kwargs)
+            self._apis[lang] = api
+        return api
+
+    def recognize(self, image: Image.Image, lang: str = "eng", psm: int = 6) -> Tuple[str, List[int]]:
+        api = self._get_api(lang)
+        api.SetPageSegMode(psm)
+        api.SetImage(image)
+        text = api.GetUTF8Text()
+        confidences = [conf for conf in api.AllWordConfidences() if conf > 0]
+        return text, confidences
+
+    def close(self) -> None:
+        for api in self._apis.values():
+            api.End()
+        self._apis.clear()
+
+
+_ENGINES = {
+    "tesserocr": TesserocrEngine,
+    "pytesseract": PytesseractEngine,
+}
+
+_local = threading.local()
+
+
+def create_engine(name: Optional[str] = None) -> OCREngine:
+    """
+    Build an OCR engine by name.
+    "auto" prefers tesserocr and falls back to pytesseract if the bindings
+    are missing or the API cannot be initialized.
+    """
+    name = (name or OCR_ENGINE).lower()
+
+    if name == "auto":
+        try:
+            engine = TesserocrEngine()
+            engine._get_api("eng")
+            return engine
+        except Exception:
+            return PytesseractEngine()
+
+    if name not in _ENGINES:
+        raise ValueError(f"Unknown OCR engine: {name}")
+    return _ENGINES[name]()
+
+
+def get_engine() -> OCREngine:
+    """Return the OCR engine owned by the current worker thread."""
+    engine = getattr(_local, "engine", None)
+    if engine is None:
+        engine = create_engine()
+        _local.engine = engine
+    return engine
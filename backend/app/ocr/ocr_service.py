@@ -1,18 +1,71 @@
 """
 OCR Service for extracting text from images.
-Uses Pytesseract for high-accuracy optical character recognition.
+Uses Tesseract (via the engine backends in engine.py) for optical character recognition.
 Supports JPG, PNG, BMP, TIFF formats.
 """
 
-import pytesseract  # type: ignore
 from PIL import Image  # type: ignore
 import io
+import logging
+import os
 import re
 from datetime import datetime
-from typing import Dict, List, Tuple, Optional
-pytesseract.pytesseract.tesseract_cmd = (
-    r"C:\Users\reshm\AppData\Local\Programs\Tesseract-OCR\tesseract.exe"
-)
+from typing import Callable, Dict, List, Tuple, Optional, Union
+
+from .engine import get_engine
+from .vendor_index import vendor_index
+
+logger = logging.getLogger(__name__)
+
+# Escalation ladder: (tier name, apply heavy preprocessing, PSM modes to try)
+# PSM 6: Assume a single uniform block of text (good for receipts)
+# PSM 3: Fully automatic page segmentation (better for complex layouts)
+# PSM 4: Single column of text of variable sizes
+OCR_TIERS = [
+    ("native", False, [6]),
+    ("enhanced", True, [6]),
+    ("full", True, [3, 4]),
+]
+
+# A tier's result is accepted when it clears these thresholds
+OCR_ACCEPT_CONFIDENCE = float(os.getenv("OCR_ACCEPT_CONFIDENCE", "80"))
+OCR_ACCEPT_COMPLETENESS = float(os.getenv("OCR_ACCEPT_COMPLETENESS", "0.67"))
+
+# Keyword fallback for receipts whose vendor is not in the vendor directory
+CATEGORY_KEYWORDS = {
+    # Food & dining: hotels/restaurants/eateries
+    'food': [
+        'restaurant', 'resto', 'dining', 'food', 'eatery', 'biryani', 'briyani', 'baker', 'bakery',
+        'cafe', 'coffee', 'tea', 'snack', 'meal', 'lunch', 'dinner', 'breakfast', 'canteen', 'kitchen',
+        'grill', 'bar', 'pub', 'hotel', 'chicken', 'noodle', 'noodles', 'fried', 'rice', 'egg'
+    ],
+    # Accommodation: lodging/stay/rooms
+    'accommodation': [
+        'lodge', 'lodging', 'stay', 'room', 'rooms', 'resort', 'inn', 'motel', 'guest house',
+        'homestay', 'hostel', 'suite', 'accommodation', 'night', 'bed', 'hotel'
+    ],
+    # Transport: travel tickets/fare/carriers
+    'transport': [
+        'travel', 'travels', 'taxi', 'cab', 'uber', 'lyft', 'ola', 'bus', 'coach', 'train', 'rail',
+        'metro', 'tram', 'ferry', 'flight', 'airline', 'airways', 'boarding', 'fare', 'ticket',
+        'parking', 'toll', 'fuel', 'petrol', 'diesel', 'gas'
+    ],
+    # Shopping: traders/shops/stores/textiles/cloth purchases
+    'shopping': [
+        'trader', 'traders', 'shop', 'shops', 'store', 'stores', 'mart', 'market', 'supermarket',
+        'grocery', 'provision', 'provisions', 'textile', 'textiles', 'cloth', 'clothing', 'garment',
+        'apparel', 'boutique', 'retail', 'outlet', 'purchase', 'purchases', 'electronics', 'hardware'
+    ],
+    # Activities: movies/tourist entries/events
+    'activities': [
+        'movie', 'cinema', 'theater', 'theatre', 'park', 'zoo', 'museum', 'gallery', 'tour', 'tourist',
+        'attraction', 'ticket', 'tickets', 'entry', 'admission', 'show', 'event', 'concert', 'festival',
+        'ride', 'amusement', 'experience'
+    ],
+    # Misc fallback keywords to bias if seen
+    'miscellaneous': ['misc', 'other']
+}
+
 
 def preprocess_image(image: Image.Image) -> Image.Image:
     """
@@ -53,62 +106,123 @@ def preprocess_image(image: Image.Image) -> Image.Image:
         
         return img_enhanced
     except Exception as e:
-        print(f"[OCR DEBUG] Error in preprocess_image: {e}")
+        logger.warning("preprocess_image failed: %s", e)
         # Return original grayscale if preprocessing fails
         return image.convert('L')
 
 
-def extract_text_from_image(image_bytes: bytes, lang: str = "eng") -> Dict:
+def open_image(image_source: Union[bytes, memoryview, str]) -> Image.Image:
+    """
+    Open an image from raw bytes, a memoryview of an in-memory upload,
+    or the path of an upload spooled to disk.
+    """
+    if isinstance(image_source, str):
+        return Image.open(image_source)
+    return Image.open(io.BytesIO(image_source))
+
+
+def extract_text_from_image(
+    image_source: Union[bytes, memoryview, str],
+    lang: str = "eng",
+    completeness: Optional[Callable[[str], float]] = None
+) -> Dict:
     """
-    Extract text from image using Pytesseract.
+    Extract text from image using the configured OCR engine.
     
     Args:
-        image_bytes: Image file bytes
+        image_source: Image file bytes, memoryview, or path to the image file
         lang: Tesseract language code (default: "eng" for English)
+        completeness: Optional function scoring extracted text from 0 to 1,
+            used to decide whether to escalate (see extract_text_from_pil_image)
     
     Returns:
         Dict with extracted text and confidence metrics
     """
     try:
-        # Open image from bytes
-        image = Image.open(io.BytesIO(image_bytes))
-        
-        # Preprocess for better accuracy
-        processed_image = preprocess_image(image)
-        
-        # Try multiple PSM (Page Segmentation Mode) configurations for better results
-        # PSM 6: Assume a single uniform block of text (default, good for receipts)
-        # PSM 3: Fully automatic page segmentation (better for complex layouts)
-        extracted_text = ""
-        best_confidence = 0
-        
-        for psm_mode in [6, 3, 4]:
-            try:
-                config = f'--psm {psm_mode}'
-                text_attempt = pytesseract.image_to_string(processed_image, lang=lang, config=config)
-                data_attempt = pytesseract.image_to_data(processed_image, output_type='dict', lang=lang, config=config)
+        image = open_image(image_source)
+    except Exception as e:
+        return _ocr_error(e)
+    
+    return extract_text_from_pil_image(image, lang=lang, completeness=completeness)
+
+
+def extract_text_from_document_page(document, index: int, lang: str = "eng") -> Dict:
+    """
+    Render a single page of a multi-page document (see documents.py) and extract its text.
+    Only this page is held in memory while it is processed.
+    """
+    try:
+        image = document.render(index)
+    except Exception as e:
+        return _ocr_error(e)
+    
+    return extract_text_from_pil_image(image, lang=lang)
+
+
+def extract_text_from_pil_image(
+    image: Image.Image,
+    lang: str = "eng",
+    completeness: Optional[Callable[[str], float]] = None
+) -> Dict:
+    """
+    Extract text from an already opened PIL image using the OCR escalation ladder.
+    
+    Starts with the cheapest tier and only escalates to heavier preprocessing and
+    more PSM modes while the best result so far is below OCR_ACCEPT_CONFIDENCE or,
+    when a completeness function is given, below OCR_ACCEPT_COMPLETENESS.
+    
+    Args:
+        image: Opened image
+        lang: Tesseract language code
+        completeness: Optional function scoring extracted text from 0 to 1
+            (e.g. receipt_field_completeness)
+    
+    Returns:
+        Dict with extracted text, confidence metrics and the tier that answered
+    """
+    try:
+        engine = get_engine()
+        best = None  # (rank, confidence, text, tier, completeness score)
+        passes = 0
+        last_error = None
+        native_image = None
+        processed_image = None
+        
+        for tier, preprocess, psm_modes in OCR_TIERS:
+            if preprocess:
+                if processed_image is None:
+                    processed_image = preprocess_image(image)
+                tier_image = processed_image
+            else:
+                if native_image is None:
+                    native_image = image if image.mode == 'L' else image.convert('L')
+                tier_image = native_image
+            
+            for psm_mode in psm_modes:
+                try:
+                    text_attempt, confidences = engine.recognize(tier_image, lang=lang, psm=psm_mode)
+                except Exception as e:
+                    logger.debug("%s tier PSM %s failed: %s", tier, psm_mode, e)
+                    last_error = e
+                    continue
                 
-                # Calculate confidence
-                confidences = [int(conf) for conf in data_attempt['conf'] if int(conf) > 0]
+                passes += 1
                 avg_conf = sum(confidences) / len(confidences) if confidences else 0
+                score = completeness(text_attempt) if completeness is not None else None
                 
-                # Use the result with best confidence
-                if avg_conf > best_confidence:
-                    best_confidence = avg_conf
-                    extracted_text = text_attempt
-                    data = data_attempt
-            except Exception as e:
-                print(f"[OCR DEBUG] PSM {psm_mode} failed: {e}")
-                continue
+                # Keep the best result across all tiers: non-empty text first, then the
+                # more complete one (so escalating for completeness can pay off), then confidence
+                rank = (bool(text_attempt.strip()), score or 0.0, avg_conf)
+                if best is None or rank > best[0]:
+                    best = (rank, avg_conf, text_attempt, tier, score)
+            
+            if best is not None and _is_acceptable(best[1], best[2], best[4]):
+                break
         
-        # Fallback to default if all PSM modes failed
-        if not extracted_text:
-            extracted_text = pytesseract.image_to_string(processed_image, lang=lang)
-            data = pytesseract.image_to_data(processed_image, output_type='dict', lang=lang)
+        if best is None:
+            raise last_error or RuntimeError("OCR produced no result")
         
-        # Calculate average confidence (filter out zero values)
-        confidences = [int(conf) for conf in data['conf'] if int(conf) > 0]
-        avg_confidence = sum(confidences) / len(confidences) if confidences else best_confidence
+        _, avg_confidence, extracted_text, answered_tier, _ = best
         
         # Clean up extracted text
         cleaned_text = clean_text(extracted_text)
@@ -120,26 +234,53 @@ def extract_text_from_image(image_bytes: bytes, lang: str = "eng") -> Dict:
             "confidence": round(avg_confidence, 2),
             "character_count": len(cleaned_text),
             "word_count": len(cleaned_text.split()),
-            "confidence_level": get_confidence_level(avg_confidence)
+            "confidence_level": get_confidence_level(avg_confidence),
+            "ocr_tier": answered_tier,
+            "ocr_passes": passes
         }
     
     except Exception as e:
-        error_msg = str(e)
-        # Check if it's a Tesseract installation issue
-        if "tesseract" in error_msg.lower() or "not found" in error_msg.lower():
-            return {
-                "status": "error",
-                "error": "Tesseract OCR engine not installed. Please install Tesseract-OCR from https://github.com/UB-Mannheim/tesseract/wiki",
-                "text": "",
-                "confidence": 0
-            }
-        else:
-            return {
-                "status": "error",
-                "error": f"OCR processing failed: {error_msg}",
-                "text": "",
-                "confidence": 0
-            }
+        return _ocr_error(e)
+
+
+def _is_acceptable(confidence: float, text: str, completeness: Optional[float]) -> bool:
+    """Whether an OCR result (with its completeness score, if scored) is good enough to stop escalating."""
+    if not text.strip() or confidence < OCR_ACCEPT_CONFIDENCE:
+        return False
+    if completeness is not None and completeness < OCR_ACCEPT_COMPLETENESS:
+        return False
+    return True
+
+
+def receipt_field_completeness(text: str) -> float:
+    """Fraction of receipt fields (vendor, amount, date) found in the text."""
+    data = extract_receipt_data(text)
+    found = [
+        data.get("vendor") not in (None, "", "Receipt Item"),
+        data.get("amount") is not None,
+        data.get("detected_date") is not None,
+    ]
+    return sum(found) / len(found)
+
+
+def _ocr_error(e: Exception) -> Dict:
+    """Build the error result for a failed OCR run."""
+    error_msg = str(e)
+    # Check if it's a Tesseract installation issue
+    if "tesseract" in error_msg.lower() or "not found" in error_msg.lower():
+        return {
+            "status": "error",
+            "error": "Tesseract OCR engine not installed. Please install Tesseract-OCR from https://github.com/UB-Mannheim/tesseract/wiki",
+            "text": "",
+            "confidence": 0
+        }
+    else:
+        return {
+            "status": "error",
+            "error": f"OCR processing failed: {error_msg}",
+            "text": "",
+            "confidence": 0
+        }
 
 
 def clean_text(text: str) -> str:
@@ -270,18 +411,6 @@ def extract_receipt_data(text: str) -> Dict:
         text_lower = text.lower()
     
         # DATE DETECTION (detect a receipt/bill date)
-        print(f"\n[OCR DEBUG] === DATE DETECTION ===")
-        print(f"[OCR DEBUG] Searching in text of length: {len(text)}")
-        print(f"[OCR DEBUG] First 500 chars of text:\n{text[:500]}")
-        
-        # Quick test: Does the date string exist in the text?
-        if "Date :" in text or "Date:" in text:
-            print(f"[OCR DEBUG] ✓ Found 'Date :' or 'Date:' in text")
-            # Extract the line containing Date
-            for line in text.split('\n'):
-                if 'Date' in line and '/' in line:
-                    print(f"[OCR DEBUG] Date line found: '{line}'")
-        
         # Look for dates - prioritize most specific patterns first
         date_patterns = [
             # Exact "Date : XX/XX/XXXX" format (with space after colon)
@@ -347,11 +476,10 @@ def extract_receipt_data(text: str) -> Dict:
         for pattern in date_patterns:
             try:
                 matches = re.findall(pattern, text, re.IGNORECASE)
-                print(f"[OCR DEBUG] Pattern '{pattern[:50]}...'")
-                print(f"[OCR DEBUG]   -> Matches: {matches} (type: {type(matches[0]) if matches else 'N/A'})")
+                if matches:
+                    logger.debug("date pattern %r matched %r", pattern, matches)
                 for match in matches:
                     try:
-                        print(f"[OCR DEBUG]   -> Processing match: {match} (type: {type(match)})")
                         # Handle both string matches and tuple matches (from grouped patterns)
                         if isinstance(match, tuple):
                             # For patterns with groups, reconstruct the date
@@ -361,49 +489,38 @@ def extract_receipt_data(text: str) -> Dict:
                                 match_str = "/".join(str(m) for m in match)
                         else:
                             match_str = match
-                        
-                        print(f"[OCR DEBUG]   -> match_str: '{match_str}'")
-                        
+
+
                         # Filter out address-like dates (e.g., 11/2 from "11/2 NT NAGAR")
                         # Valid dates should have day <= 31, month <= 12, and year >= 2000
                         parts = match_str.split('/')
-                        print(f"[OCR DEBUG]   -> parts: {parts}")
                         if len(parts) >= 3:
                             try:
                                 day, month, year = int(parts[0]), int(parts[1]), int(parts[2])
-                                print(f"[OCR DEBUG]   -> Parsed: day={day}, month={month}, year={year}")
                                 # Skip if it looks like an address (no year or invalid year)
                                 if year < 100:  # 2-digit year
                                     year += 2000
                                 if year < 2000 or year > 2099:
-                                    print(f"[OCR DEBUG]   -> Skipping invalid year: {year}")
                                     continue
                                 if day > 31 or month > 12 or day < 1 or month < 1:
-                                    print(f"[OCR DEBUG]   -> Skipping invalid date: day={day}, month={month}")
                                     continue
-                            except (ValueError, IndexError) as e:
-                                print(f"[OCR DEBUG]   -> Parsing error: {e}")
+                            except (ValueError, IndexError):
                                 pass
                         
                         parsed = _parse_date_str(match_str)
-                        print(f"[OCR DEBUG]   -> _parse_date_str returned: {parsed}")
-                        print(f"[OCR DEBUG]   -> '{match_str}' parsed to: {parsed}")
                         if parsed:
                             detected_date = parsed
-                            print(f"[OCR DEBUG]   -> SUCCESS! Using date: {detected_date}")
                             break
                     except Exception as e:
-                        print(f"[OCR DEBUG]   -> Error processing match '{match}': {e}")
+                        logger.debug("date match %r failed: %s", match, e)
                         continue
                 if detected_date:
                     break
             except Exception as e:
-                print(f"[OCR DEBUG] Error with pattern '{pattern}': {e}")
+                logger.debug("date pattern %r failed: %s", pattern, e)
                 continue
         
-        if not detected_date:
-            print(f"[OCR DEBUG] No date detected from any pattern")
-        print(f"[OCR DEBUG] Final detected_date: {detected_date}")
+        logger.debug("detected date: %s", detected_date)
         
         # AMOUNT DETECTION (enhanced with more patterns)
         amount_patterns = [
@@ -449,12 +566,18 @@ def extract_receipt_data(text: str) -> Dict:
         # Try multiple strategies for vendor name extraction
         lines = [line.strip() for line in text.split('\n') if line.strip()]
         
+        # Strategy 0: Known vendor from the vendor directory (canonical name + category)
+        vendor_match = vendor_index.match_lines(lines[:6])
+        if vendor_match:
+            vendor_name = vendor_match.text
+        
         # Strategy 1: First non-empty line that looks like a business name
-        for line in lines[:6]:  # Check first few lines
-            # Skip lines that are just numbers or addresses
-            if re.match(r'^[A-Za-z][A-Za-z\s&\'\-\.]{2,40}$', line) and not re.search(r'\d{3,}', line):
-                vendor_name = line[:40]
-                break
+        if not vendor_name:
+            for line in lines[:6]:  # Check first few lines
+                # Skip lines that are just numbers or addresses
+                if re.match(r'^[A-Za-z][A-Za-z\s&\'\-\.]{2,40}$', line) and not re.search(r'\d{3,}', line):
+                    vendor_name = line[:40]
+                    break
 
         # Strategy 1b: Prefer lines mentioning biryani/briyani/biriyani or royal
         if not vendor_name:
@@ -488,56 +611,28 @@ def extract_receipt_data(text: str) -> Dict:
                 vendor_name = best[1][:40]
         
         # CATEGORY DETECTION (food / accommodation / transport / shopping / activities / misc)
-        category_keywords = {
-            # Food & dining: hotels/restaurants/eateries
-            'food': [
-                'restaurant', 'resto', 'dining', 'food', 'eatery', 'biryani', 'briyani', 'baker', 'bakery',
-                'cafe', 'coffee', 'tea', 'snack', 'meal', 'lunch', 'dinner', 'breakfast', 'canteen', 'kitchen',
-                'grill', 'bar', 'pub', 'hotel', 'chicken', 'noodle', 'noodles', 'fried', 'rice', 'egg'
-            ],
-            # Accommodation: lodging/stay/rooms
-            'accommodation': [
-                'lodge', 'lodging', 'stay', 'room', 'rooms', 'resort', 'inn', 'motel', 'guest house',
-                'homestay', 'hostel', 'suite', 'accommodation', 'night', 'bed', 'hotel'
-            ],
-            # Transport: travel tickets/fare/carriers
-            'transport': [
-                'travel', 'travels', 'taxi', 'cab', 'uber', 'lyft', 'ola', 'bus', 'coach', 'train', 'rail',
-                'metro', 'tram', 'ferry', 'flight', 'airline', 'airways', 'boarding', 'fare', 'ticket',
-                'parking', 'toll', 'fuel', 'petrol', 'diesel', 'gas'
-            ],
-            # Shopping: traders/shops/stores/textiles/cloth purchases
-            'shopping': [
-                'trader', 'traders', 'shop', 'shops', 'store', 'stores', 'mart', 'market', 'supermarket',
-                'grocery', 'provision', 'provisions', 'textile', 'textiles', 'cloth', 'clothing', 'garment',
-                'apparel', 'boutique', 'retail', 'outlet', 'purchase', 'purchases', 'electronics', 'hardware'
-            ],
-            # Activities: movies/tourist entries/events
-            'activities': [
-                'movie', 'cinema', 'theater', 'theatre', 'park', 'zoo', 'museum', 'gallery', 'tour', 'tourist',
-                'attraction', 'ticket', 'tickets', 'entry', 'admission', 'show', 'event', 'concert', 'festival',
-                'ride', 'amusement', 'experience'
-            ],
-            # Misc fallback keywords to bias if seen
-            'miscellaneous': ['misc', 'other']
-        }
-        
-        category_scores = {}
-        # Check both full text and vendor name
-        for category, keywords in category_keywords.items():
-            text_score = sum(text_lower.count(kw) for kw in keywords)
-            vendor_score = sum(vendor_name.lower().count(kw) for kw in keywords) * 4 if vendor_name else 0
-            category_scores[category] = text_score + vendor_score
-        
-        # Determine category based on scores
-        max_score = max(category_scores.values()) if category_scores else 0
-        if max_score > 0:
-            detected_category = max(category_scores.items(), key=lambda x: x[1])[0]
-            category_confidence = min(95, 70 + max_score * 8)
+        if vendor_match:
+            # Known vendor: the directory already knows its category, no keyword scan needed
+            detected_category = vendor_match.category
+            category_confidence = 70 + 25 * vendor_match.similarity
+            category_scores = {detected_category: round(vendor_match.similarity * 100)}
         else:
-            # Default to miscellaneous when nothing matches
-            detected_category = "miscellaneous"
-            category_confidence = 40
+            category_scores = {}
+            # Check both full text and vendor name
+            for category, keywords in CATEGORY_KEYWORDS.items():
+                text_score = sum(text_lower.count(kw) for kw in keywords)
+                vendor_score = sum(vendor_name.lower().count(kw) for kw in keywords) * 4 if vendor_name else 0
+                category_scores[category] = text_score + vendor_score
+            
+            # Determine category based on scores
+            max_score = max(category_scores.values()) if category_scores else 0
+            if max_score > 0:
+                detected_category = max(category_scores.items(), key=lambda x: x[1])[0]
+                category_confidence = min(95, 70 + max_score * 8)
+            else:
+                # Default to miscellaneous when nothing matches
+                detected_category = "miscellaneous"
+                category_confidence = 40
         
         return {
             "vendor": vendor_name or "Receipt Item",
@@ -550,10 +645,8 @@ def extract_receipt_data(text: str) -> Dict:
             "text": text
         }
     
-    except Exception as e:
-        print(f"[OCR DEBUG] ERROR in extract_receipt_data: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("extract_receipt_data failed")
         return {
             "vendor": "Receipt Item",
             "amount": None,
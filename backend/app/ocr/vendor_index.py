@@ -0,0 +1,226 @@
+"""
+Vendor directory for receipt scanning.
+
+Known vendors (a seed list plus every place users have saved as an expense)
+are kept in a trigram inverted index keyed by normalized name. OCR lines are
+matched with a bounded edit distance, but only against vendors that share
+enough trigrams with the line, so a lookup touches a handful of candidates
+instead of scanning the whole directory. A match resolves both the canonical
+vendor name and its category, and the index grows as users confirm expenses.
+
+Configuration (environment variables):
+- VENDOR_INDEX_MAX_SIZE: maximum number of vendors kept in memory (default: 50000)
+"""
+
+import csv
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+
+VENDOR_INDEX_MAX_SIZE = int(os.getenv("VENDOR_INDEX_MAX_SIZE", "50000"))
+
+SEED_FILE = Path(__file__).parent / "data" / "vendors.csv"
+
+# Expense categories (as stored by the budget page) -> receipt scanner categories
+EXPENSE_TO_RECEIPT_CATEGORY = {
+    "stay": "accommodation",
+    "misc": "miscellaneous",
+}
+
+MIN_QUERY_LENGTH = 4
+
+
+def normalize_vendor(name: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    name = re.sub(r"[^a-z0-9\s]", "", name.lower())
+    return " ".join(name.split())
+
+
+def edit_distance(a: str, b: str, limit: Optional[int] = None) -> int:
+    """
+    Levenshtein distance between two strings. With a limit, stops early and
+    returns limit + 1 once the distance is known to exceed it.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if limit is not None and len(a) - len(b) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            ))
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def trigrams(key: str) -> Set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class VendorMatch:
+    def __init__(self, name: str, category: str, distance: int, query: str):
+        self.name = name
+        # Name to show: the canonical name, or the receipt's own line when it already contains it
+        self.text = name
+        self.category = category
+        self.distance = distance
+        self.similarity = 1 - distance / max(len(query), 1)
+
+
+class _Vendor:
+    __slots__ = ("name", "categories")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.categories: Dict[str, int] = {}
+
+    @property
+    def category(self) -> str:
+        return max(self.categories.items(), key=lambda item: item[1])[0]
+
+    @property
+    def uses(self) -> int:
+        return sum(self.categories.values())
+
+
+class VendorIndex:
+    """Trigram index of vendor names. Inserts and lookups are safe across threads."""
+
+    def __init__(self, max_size: int = VENDOR_INDEX_MAX_SIZE):
+        self.max_size = max_size
+        self._vendors: Dict[str, _Vendor] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return len(self._vendors)
+
+    def add(self, name: str, category: str, weight: int = 1) -> None:
+        """Add a vendor, or count another use of its category if already known."""
+        key = normalize_vendor(name or "")
+        if len(key) < MIN_QUERY_LENGTH or not category:
+            return
+        category = EXPENSE_TO_RECEIPT_CATEGORY.get(category.lower(), category.lower())
+
+        with self._lock:
+            vendor = self._vendors.get(key)
+            if vendor is None:
+                if len(self._vendors) >= self.max_size:
+                    return
+                vendor = self._vendors[key] = _Vendor(name.strip())
+                for gram in trigrams(key):
+                    self._postings.setdefault(gram, set()).add(key)
+            vendor.categories[category] = vendor.categories.get(category, 0) + weight
+
+    def search(self, query: str, max_distance: Optional[int] = None) -> Optional[VendorMatch]:
+        """Closest vendor within max_distance edits (default: ~20% of the query length)."""
+        key = normalize_vendor(query or "")
+        if len(key) < MIN_QUERY_LENGTH:
+            return None
+        if max_distance is None:
+            max_distance = max(1, len(key) // 5)
+
+        with self._lock:
+            exact = self._vendors.get(key)
+            if exact is not None:
+                return VendorMatch(exact.name, exact.category, 0, key)
+
+            # Count filter: each edit destroys at most 3 of the query's trigrams,
+            # so only vendors sharing enough trigrams need an edit distance check
+            grams = trigrams(key)
+            shared: Dict[str, int] = {}
+            for gram in grams:
+                for candidate in self._postings.get(gram, ()):
+                    shared[candidate] = shared.get(candidate, 0) + 1
+            required = max(1, len(grams) - 3 * max_distance)
+
+            best = None
+            for candidate, count in shared.items():
+                if count < required or abs(len(candidate) - len(key)) > max_distance:
+                    continue
+                distance = edit_distance(key, candidate, limit=max_distance)
+                if distance > max_distance:
+                    continue
+                vendor = self._vendors[candidate]
+                rank = (distance, -vendor.uses)
+                if best is None or rank < best[0]:
+                    best = (rank, vendor)
+
+            if best is None:
+                return None
+            return VendorMatch(best[1].name, best[1].category, best[0][0], key)
+
+    def match_lines(self, lines: Iterable[str]) -> Optional[VendorMatch]:
+        """
+        Best match among receipt header lines. Each line is tried whole and by
+        its leading words, since vendor names are often followed by branch info.
+        A single leading word only counts when it matches a vendor exactly.
+
+        Fuzzy matching corrects OCR errors, not correct text: when the line
+        contains the canonical name as whole words (e.g. "Indian Oil Petrol
+        Bunk" for "Indian Oil"), `text` keeps the line as printed.
+        """
+        best = None
+        best_line = ""
+        for line in lines:
+            words = normalize_vendor(line).split()
+            candidates = [" ".join(words[:n]) for n in (len(words), 3, 2) if n <= len(words)]
+            for candidate in dict.fromkeys(candidates):
+                match = self.search(candidate)
+                if match and (best is None or match.similarity > best.similarity):
+                    best, best_line = match, line
+            if best is None and words:
+                best, best_line = self.search(words[0], max_distance=0), line
+            if best is not None and best.distance == 0:
+                break
+
+        if best is not None:
+            printed = normalize_vendor(best_line)
+            if f" {normalize_vendor(best.name)} " in f" {printed} ":
+                best.text = best_line.strip()[:40]
+        return best
+
+
+def load_seed_vendors(index: VendorIndex, path: Path = SEED_FILE) -> None:
+    if not path.exists():
+        return
+    with path.open(encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            index.add(row["name"], row["category"])
+
+
+async def load_expense_vendors(db, index: Optional["VendorIndex"] = None) -> int:
+    """
+    Add vendors from saved expenses (budget.expenses.place), most used first.
+    Returns the number of (place, category) pairs loaded.
+    """
+    from sqlalchemy import select, func, desc
+    from ..models.expense import Expense
+
+    index = index or vendor_index
+    uses = func.count().label("uses")
+    result = await db.execute(
+        select(Expense.place, Expense.category, uses)
+        .group_by(Expense.place, Expense.category)
+        .order_by(desc(uses))
+        .limit(index.max_size)
+    )
+    rows = result.all()
+    for place, category, count in rows:
+        index.add(place, category, weight=count)
+    return len(rows)
+
+
+vendor_index = VendorIndex()
+load_seed_vendors(vendor_index)
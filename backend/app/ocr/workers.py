@@ -0,0 +1,59 @@
+"""
+Bounded worker pool for OCR.
+OCR is CPU-bound, so it runs off the event loop. Each worker thread owns its
+own OCR engine (see engine.get_engine), keeping Tesseract initialized between calls.
+
+Configuration (environment variables):
+- OCR_WORKERS: number of OCR worker threads (default: CPU count)
+"""
+
+import asyncio
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(os.cpu_count() or 2)))
+
+_executor = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=OCR_WORKERS, thread_name_prefix="ocr")
+
+    return _executor
+
+
+async def run_ocr(func, *args, **kwargs):
+    """Run an OCR function on the worker pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), partial(func, *args, **kwargs))
+
+
+async def map_ocr_ordered(func, items, window: int = OCR_WORKERS):
+    """
+    Run func(item) on the worker pool for each item and yield results in order.
+    At most `window` items are in flight at once, which bounds memory for
+    page-by-page document processing.
+    """
+    pending = deque()
+    items = iter(items)
+
+    for item in items:
+        pending.append(asyncio.ensure_future(run_ocr(func, item)))
+        if len(pending) >= window:
+            break
+
+    try:
+        while pending:
+            result = await pending.popleft()
+            for item in items:
+                pending.append(asyncio.ensure_future(run_ocr(func, item)))
+                break
+            yield result
+    finally:
+        for future in pending:
+            future.cancel()
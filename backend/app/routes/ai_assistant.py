@@ -1,4 +1,9 @@
-from fastapi import APIRouter, UploadFile, File, Security, Depends
+import json
+import logging
+from functools import partial
+
+from fastapi import APIRouter, Security, Depends
+from fastapi.responses import StreamingResponse
 from ..schemas.ai_assistant import (
     AIChatRequest, AIChatResponse, AIRAGRequest, AIRAGResponse,
     OCRResponse, OCRWithRAGRequest, OCRWithRAGResponse, TravelDocumentAnalysis,
@@ -8,18 +13,29 @@ from ..core.openai_client import ask_openai, ask_openai_long
 from ..rag.pipeline import rag_pipeline
 from ..ocr.ocr_service import (
     extract_text_from_image,
+    extract_text_from_document_page,
     extract_travel_info,
     ocr_with_rag,
-    extract_receipt_data
+    extract_receipt_data,
+    receipt_field_completeness
 )
+from ..ocr.documents import open_document
+from ..ocr.workers import run_ocr, map_ocr_ordered
 from ..dependencies.auth import get_current_user_id
+from ..dependencies.rate_limit import rate_limit, ai_limiter, current_user
+from ..dependencies.uploads import UploadedFile, image_upload
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/ai",
     tags=["AI Assistant"]
 )
 
-@router.post("/chat", response_model=AIChatResponse)
+# Routes that call a paid upstream API; the OCR routes run locally and are not limited
+ai_rate_limit = Depends(rate_limit(ai_limiter, key=current_user))
+
+@router.post("/chat", response_model=AIChatResponse, dependencies=[ai_rate_limit])
 async def chat_with_ai(
     payload: AIChatRequest,
     user_id: int = Security(get_current_user_id)
@@ -47,7 +63,7 @@ async def chat_with_ai(
         )
 
 
-@router.post("/rag-chat", response_model=AIRAGResponse)
+@router.post("/rag-chat", response_model=AIRAGResponse, dependencies=[ai_rate_limit])
 async def chat_with_rag(
     payload: AIRAGRequest,
     user_id: int = Security(get_current_user_id)
@@ -72,8 +88,8 @@ async def chat_with_rag(
 
 @router.post("/ocr", response_model=OCRResponse)
 async def extract_text_ocr(
-    file: UploadFile = File(...),
-    user_id: int = Security(get_current_user_id)
+    user_id: int = Security(get_current_user_id),
+    upload: UploadedFile = Depends(image_upload())
 ):
     """
     Extract text from uploaded image using OCR.
@@ -81,23 +97,8 @@ async def extract_text_ocr(
     Returns: Extracted text with confidence score and metadata
     """
     try:
-        # Read uploaded file
-        image_bytes = await file.read()
-        
-        # Validate file size (max 10MB)
-        if len(image_bytes) > 10 * 1024 * 1024:
-            return {
-                "status": "error",
-                "text": "",
-                "confidence": 0,
-                "confidence_level": "very low",
-                "character_count": 0,
-                "word_count": 0,
-                "error": "File size exceeds 10MB limit"
-            }
-        
         # Extract text from image
-        result = extract_text_from_image(image_bytes)
+        result = await run_ocr(extract_text_from_image, upload.source)
         
         return {
             "status": result.get("status"),
@@ -107,6 +108,7 @@ async def extract_text_ocr(
             "confidence_level": result.get("confidence_level", "very low"),
             "character_count": result.get("character_count", 0),
             "word_count": result.get("word_count", 0),
+            "ocr_tier": result.get("ocr_tier"),
             "error": result.get("error")
         }
     
@@ -122,7 +124,7 @@ async def extract_text_ocr(
         }
 
 
-@router.post("/ocr-with-rag", response_model=OCRWithRAGResponse)
+@router.post("/ocr-with-rag", response_model=OCRWithRAGResponse, dependencies=[ai_rate_limit])
 async def ocr_chat_with_rag(
     payload: OCRWithRAGRequest,
     user_id: int = Security(get_current_user_id)
@@ -154,18 +156,35 @@ async def ocr_chat_with_rag(
 
 @router.post("/analyze-travel-document")
 async def analyze_travel_document(
-    file: UploadFile = File(...),
-    user_id: int = Security(get_current_user_id)
-) -> dict:
+    user_id: int = Security(get_current_user_id),
+    upload: UploadedFile = Depends(image_upload(allow_documents=True))
+):
     """
-    Analyze uploaded travel document image.
+    Analyze uploaded travel document (image, multi-page TIFF or PDF).
     Extracts text and identifies travel-related information (dates, prices, keywords).
+    
+    Single-page files return one JSON object. Multi-page documents are streamed as
+    NDJSON: one line per page as soon as it is OCR'd, then a summary line.
     """
     try:
-        image_bytes = await file.read()
-        
+        document = await run_ocr(open_document, upload.source, upload.content_type)
+    except Exception:
+        from fastapi import HTTPException
+        raise HTTPException(
+            status_code=400,
+            detail="Unable to open the document. Please try another file."
+        )
+    
+    if document.page_count > 1:
+        upload.detach()
+        return StreamingResponse(
+            _stream_document_pages(document, upload),
+            media_type="application/x-ndjson"
+        )
+    
+    try:
         # Extract text
-        ocr_result = extract_text_from_image(image_bytes)
+        ocr_result = await run_ocr(extract_text_from_document_page, document, 0)
         
         if ocr_result.get("status") == "error":
             return {
@@ -180,6 +199,7 @@ async def analyze_travel_document(
             "status": "success",
             "extracted_text": ocr_result.get("text"),
             "confidence": ocr_result.get("confidence"),
+            "ocr_tier": ocr_result.get("ocr_tier"),
             "travel_analysis": {
                 "travel_keywords_found": travel_analysis.get("travel_keywords_found", []),
                 "potential_prices": travel_analysis.get("potential_prices", []),
@@ -194,12 +214,67 @@ async def analyze_travel_document(
             status_code=500,
             detail="Unable to analyze the image. Please try another file."
         )
+    finally:
+        await run_ocr(document.close)
+
+
+async def _stream_document_pages(document, upload: UploadedFile):
+    """OCR pages in parallel on the worker pool (a few at a time) and emit them in page order."""
+    keywords, prices, dates = set(), set(), set()
+    pages_failed = 0
+    
+    try:
+        page_results = map_ocr_ordered(
+            partial(extract_text_from_document_page, document),
+            range(document.page_count)
+        )
+        page_number = 0
+        async for ocr_result in page_results:
+            page_number += 1
+            line = {"page": page_number, "page_count": document.page_count}
+            
+            if ocr_result.get("status") == "error":
+                pages_failed += 1
+                line.update({
+                    "status": "error",
+                    "error": "Unable to extract text from this page."
+                })
+            else:
+                travel_analysis = extract_travel_info(ocr_result.get("text", ""))
+                keywords.update(travel_analysis["travel_keywords_found"])
+                prices.update(travel_analysis["potential_prices"])
+                dates.update(travel_analysis["potential_dates"])
+                line.update({
+                    "status": "success",
+                    "extracted_text": ocr_result.get("text"),
+                    "confidence": ocr_result.get("confidence"),
+                    "ocr_tier": ocr_result.get("ocr_tier"),
+                    "travel_analysis": travel_analysis
+                })
+            
+            yield json.dumps(line) + "\n"
+        
+        yield json.dumps({
+            "status": "success" if pages_failed < document.page_count else "error",
+            "summary": True,
+            "page_count": document.page_count,
+            "pages_failed": pages_failed,
+            "travel_analysis": {
+                "travel_keywords_found": sorted(keywords),
+                "potential_prices": sorted(prices),
+                "potential_dates": sorted(dates),
+                "is_travel_document": len(keywords) > 0
+            }
+        }) + "\n"
+    finally:
+        await run_ocr(document.close)
+        await run_ocr(upload.close)
 
 
 @router.post("/scan-receipt", response_model=ReceiptScanResponse)
 async def scan_receipt(
-    file: UploadFile = File(...),
-    user_id: int = Security(get_current_user_id)
+    user_id: int = Security(get_current_user_id),
+    upload: UploadedFile = Depends(image_upload())
 ):
     """
     Scan receipt/ticket image and extract expense data.
@@ -212,24 +287,12 @@ async def scan_receipt(
     Accuracy: 85-95% for amount detection, 75-90% for category detection
     """
     try:
-        image_bytes = await file.read()
-        
-        # Validate file size (max 10MB)
-        if len(image_bytes) > 10 * 1024 * 1024:
-            return {
-                "status": "error",
-                "extracted_text": "",
-                "vendor": "",
-                "amount": None,
-                "amount_confidence": 0,
-                "category": "shopping",
-                "category_confidence": 0,
-                "category_scores": {},
-                "error": "File size is too large. Please choose a smaller image (max 10MB)."
-            }
-        
         # Extract text from image
-        ocr_result = extract_text_from_image(image_bytes)
+        ocr_result = await run_ocr(
+            extract_text_from_image,
+            upload.source,
+            completeness=receipt_field_completeness
+        )
         
         if ocr_result.get("status") == "error":
             return {
@@ -249,19 +312,19 @@ async def scan_receipt(
         cleaned_text = ocr_result.get("text", "")
         extracted_text = raw_text or cleaned_text
         
-        # Log both versions for debugging
-        print(f"\n[OCR DEBUG] === OCR EXTRACTION DEBUG ===")
-        print(f"[OCR DEBUG] Raw text length: {len(raw_text)}")
-        print(f"[OCR DEBUG] Raw text:\n{raw_text[:500]}")
-        print(f"[OCR DEBUG] Cleaned text length: {len(cleaned_text)}")
-        print(f"[OCR DEBUG] Cleaned text:\n{cleaned_text[:500]}")
-        
         # Extract receipt data using raw text first (for better date detection)
         # since date formatting might be preserved better in raw text
         receipt_data = extract_receipt_data(extracted_text)
-        
-        # Log extracted data for debugging
-        print(f"[OCR DEBUG] Receipt data: {receipt_data}")
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("receipt scanned", extra={
+                "raw_text": raw_text[:500],
+                "cleaned_text": cleaned_text[:500],
+                "vendor": receipt_data.get("vendor"),
+                "amount": receipt_data.get("amount"),
+                "category": receipt_data.get("category"),
+                "detected_date": receipt_data.get("detected_date"),
+            })
         
         return {
             "status": "success",
@@ -273,13 +336,12 @@ async def scan_receipt(
             "category_confidence": receipt_data.get("category_confidence", 0),
             "category_scores": receipt_data.get("category_scores", {}),
             "detected_date": receipt_data.get("detected_date"),
+            "ocr_tier": ocr_result.get("ocr_tier"),
             "error": None
         }
     
     except Exception as e:
-        print(f"[OCR DEBUG] CRITICAL ERROR in scan-receipt endpoint: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("scan-receipt failed")
         from fastapi import HTTPException
         raise HTTPException(
             status_code=500,
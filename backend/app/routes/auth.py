@@ -1,13 +1,19 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, HTTPException, Depends, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.exc import IntegrityError
 
 from ..database import get_db
 from ..models.user import User
-from ..schemas.user import SignupRequest, LoginRequest
-from ..core.security import hash_password, verify_password
+from ..schemas.user import SignupRequest, LoginRequest, ChangePasswordRequest
+from ..core.security import hash_password_async, verify_password_async
 from ..core.jwt import create_access_token
+from ..core.config import ACCESS_TOKEN_EXPIRE_DELTA
+from ..core.token_revocation import token_revocations
+from ..dependencies.auth import get_current_user_id, token_cache
+from ..dependencies.rate_limit import rate_limit, login_ip_limiter, login_email_limiter, signup_ip_limiter
 
 
 router = APIRouter(
@@ -16,7 +22,11 @@ router = APIRouter(
 )
 
 # ===================== SIGNUP =====================
-@router.post("/signup", status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/signup",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit(signup_ip_limiter))]
+)
 async def signup(
     user: SignupRequest,
     db: AsyncSession = Depends(get_db)
@@ -36,7 +46,7 @@ async def signup(
     new_user = User(
         name=user.name,
         email=user.email,
-        password_hash=hash_password(user.password)
+        password_hash=await hash_password_async(user.password)
     )
 
     db.add(new_user)
@@ -58,11 +68,14 @@ async def signup(
     }
 
 # ===================== LOGIN =====================
-@router.post("/login")
+@router.post("/login", dependencies=[Depends(rate_limit(login_ip_limiter))])
 async def login(
     user: LoginRequest,
     db: AsyncSession = Depends(get_db)
 ):
+    # Before any lookup or hashing, so credential stuffing cannot drive pbkdf2 work
+    await login_email_limiter.hit(user.email.lower())
+
     result = await db.execute(
         select(User).where(User.email == user.email)
     )
@@ -74,15 +87,23 @@ async def login(
             detail="Invalid email or password"
         )
 
-    if not verify_password(
+    valid, new_hash = await verify_password_async(
         user.password,
         existing_user.password_hash
-    ):
+    )
+    if not valid:
         raise HTTPException(
             status_code=401,
             detail="Invalid email or password"
         )
 
+    # Hashing parameters changed since this password was set: store a fresh hash
+    if new_hash:
+        await db.execute(
+            update(User).where(User.id == existing_user.id).values(password_hash=new_hash)
+        )
+        await db.commit()
+
     access_token = create_access_token(
         data={"sub": str(existing_user.id)}
     )
@@ -91,3 +112,56 @@ async def login(
         "access_token": access_token,
         "token_type": "bearer"
     }
+
+# ===================== LOGOUT =====================
+@router.post("/logout")
+async def logout(
+    request: Request,
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    expires_at = request.state.token_expires_at
+    await token_revocations.revoke_token(
+        db,
+        user_id,
+        request.state.token_hash,
+        datetime.fromtimestamp(expires_at, timezone.utc) if expires_at
+        else datetime.now(timezone.utc) + ACCESS_TOKEN_EXPIRE_DELTA,
+    )
+    await db.commit()
+    token_cache.pop(request.state.token_hash)
+
+    return {"message": "Signed out"}
+
+# ===================== CHANGE PASSWORD =====================
+@router.put("/password")
+async def change_password(
+    payload: ChangePasswordRequest,
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    result = await db.execute(
+        select(User.password_hash).where(User.id == user_id)
+    )
+    password_hash = result.scalar()
+
+    valid, _ = await verify_password_async(payload.current_password, password_hash or "")
+    if not valid:
+        raise HTTPException(
+            status_code=400,
+            detail="Current password is incorrect"
+        )
+
+    await db.execute(
+        update(User).where(User.id == user_id).values(
+            password_hash=await hash_password_async(payload.new_password)
+        )
+    )
+    # Sign out every existing session; the caller continues with a new token
+    await token_revocations.revoke_user(db, user_id)
+    await db.commit()
+
+    return {
+        "access_token": create_access_token(data={"sub": str(user_id)}),
+        "token_type": "bearer"
+    }
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..models.emergency_contact import EmergencyContact
 from ..schemas.emergency_contact import (
     EmergencyContactCreate,
@@ -49,7 +49,7 @@ async def create_emergency_contact(
 
 @router.get("/", response_model=list[EmergencyContactOut])
 async def get_emergency_contact(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     user_id: int = Depends(get_current_user_id),
 ):
     result = await db.execute(
@@ -1,15 +1,30 @@
-from fastapi import APIRouter, Depends, UploadFile, File, Security
+from typing import Any, Optional
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, UploadFile, File, Response, Security
+from sqlalchemy import and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from datetime import date
-import time
-import json
-from pathlib import Path
 
-from ..database import get_db
-from ..models.expense import Expense
-from ..schemas.expense import ExpenseCreate, ExpenseResponse
+from ..database import get_db, get_read_db
+from ..models.expense import Expense, TripRollup
+from ..models.trip import Trip
+from ..schemas.expense import (
+    ExpenseCreate,
+    ExpenseResponse,
+    TripSpend,
+    BudgetSummary,
+    CategoryTotal,
+    DayTotal,
+    BulkImportResult,
+)
 from ..dependencies.auth import get_current_user_id
+from ..dependencies.pagination import PageParams, paginate
+from ..core.audit import expense_audit
+from ..core.export import ExportFormat, export_response
+from ..budget import rollups
+from ..budget.imports import ExpenseImporter, import_csv
+from ..ocr.vendor_index import vendor_index
 
 router = APIRouter(prefix="/budget", tags=["Budget"])
 
@@ -23,67 +38,120 @@ async def add_expense(
     # Extract only the fields that Expense model accepts
     payload_dict = payload.dict(exclude={"ocr_confidence"})
 
-    # #region agent log
-    try:
-        log_path = Path("c:/Users/reshm/travista_cursor/Travista/.cursor/debug.log")
-        log_entry = {
-            "sessionId": "debug-session",
-            "runId": "amount-issue",
-            "hypothesisId": "B1",
-            "location": "expense.py:add_expense",
-            "message": "Received expense payload",
-            "data": {
-                "place": payload_dict.get("place"),
-                "amount": payload_dict.get("amount"),
-                "category": payload_dict.get("category"),
-                "date": str(payload_dict.get("date")),
-                "trip_id": payload_dict.get("trip_id"),
-                "source": payload_dict.get("source"),
-            },
-            "timestamp": int(time.time() * 1000),
-        }
-        log_path.parent.mkdir(parents=True, exist_ok=True)
-        with log_path.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(log_entry) + "\n")
-    except Exception:
-        pass
-    # #endregion
-
     exp = Expense(**payload_dict, user_id=current_user)
     db.add(exp)
+    await rollups.apply_expense(db, exp)
     await db.commit()
     await db.refresh(exp)
 
-    # #region agent log
-    try:
-        log_path = Path("c:/Users/reshm/travista_cursor/Travista/.cursor/debug.log")
-        log_entry = {
-            "sessionId": "debug-session",
-            "runId": "amount-issue",
-            "hypothesisId": "B2",
-            "location": "expense.py:add_expense",
-            "message": "Stored expense",
-            "data": {
-                "id": exp.id,
-                "amount": exp.amount,
-                "date": str(exp.date),
-                "source": exp.source,
-            },
-            "timestamp": int(time.time() * 1000),
-        }
-        with log_path.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(log_entry) + "\n")
-    except Exception:
-        pass
-    # #endregion
+    # Confirmed places teach the receipt scanner new vendors
+    vendor_index.add(exp.place, exp.category)
+
+    expense_audit.emit(
+        "expense.created",
+        user_id=current_user,
+        expense_id=exp.id,
+        trip_id=exp.trip_id,
+        place=exp.place,
+        amount=exp.amount,
+        category=exp.category,
+        date=exp.date,
+        source=exp.source,
+        ocr_confidence=payload.ocr_confidence,
+    )
 
     return exp
 
+
+async def _finish_import(importer: ExpenseImporter, db: AsyncSession, source: str) -> BulkImportResult:
+    result = await importer.finish()
+    await db.commit()
+
+    # Confirmed places teach the receipt scanner new vendors
+    for place, category in importer.places:
+        vendor_index.add(place, category)
+
+    expense_audit.emit(
+        "expense.bulk_created",
+        user_id=importer.user_id,
+        source=source,
+        created=result.created,
+        rejected=len(result.errors),
+        trip_ids=sorted(importer.trip_ids),
+        first_id=result.ids[0] if result.ids else None,
+        last_id=result.ids[-1] if result.ids else None,
+    )
+    return result
+
+
+# ➕ Add many expenses at once (JSON array)
+@router.post("/expenses/bulk", response_model=BulkImportResult)
+async def bulk_add_expenses(
+    payload: list[Any] = Body(..., description="Array of ExpenseCreate objects"),
+    atomic: bool = Query(False, description="Reject the whole batch if any row is invalid"),
+    db: AsyncSession = Depends(get_db),
+    current_user: int = Security(get_current_user_id),
+):
+    """Validate each row and insert the valid ones in one transaction; invalid rows are reported by position."""
+    importer = ExpenseImporter(db, current_user, atomic=atomic)
+    for row in payload:
+        await importer.add(row)
+    return await _finish_import(importer, db, "json")
+
+
+# 📥 Import expenses from a CSV file (streamed request body, Content-Type: text/csv)
+@router.post("/expenses/import", response_model=BulkImportResult)
+async def import_expenses(
+    request: Request,
+    trip_id: Optional[int] = Query(None, description="Trip for rows without a trip_id column"),
+    atomic: bool = Query(False, description="Reject the whole file if any row is invalid"),
+    db: AsyncSession = Depends(get_db),
+    current_user: int = Security(get_current_user_id),
+):
+    """
+    Import a CSV export (e.g. from a bank) sent as the raw request body.
+    Columns: place, amount, category, date, trip_id (or ?trip_id=), source (optional).
+    """
+    content_type = request.headers.get("content-type", "").split(";", 1)[0].strip().lower()
+    if content_type != "text/csv":
+        raise HTTPException(
+            status_code=415,
+            detail="Send the CSV file as the request body with Content-Type: text/csv.",
+        )
+    importer = ExpenseImporter(db, current_user, default_trip_id=trip_id, atomic=atomic)
+    await import_csv(importer, request.stream())
+    return await _finish_import(importer, db, "csv")
+
+# 📤 Export expenses (streamed CSV / NDJSON)
+@router.get("/expenses/export")
+async def export_expenses(
+    format: ExportFormat = ExportFormat.csv,
+    trip_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_read_db),
+    user_id: int = Security(get_current_user_id),
+):
+    query = (
+        select(
+            Expense.id,
+            Expense.trip_id,
+            Expense.date,
+            Expense.place,
+            Expense.category,
+            Expense.amount,
+            Expense.source,
+        )
+        .where(Expense.user_id == user_id)
+        .order_by(Expense.date.desc(), Expense.id.desc())
+    )
+    if trip_id is not None:
+        query = query.where(Expense.trip_id == trip_id)
+    return export_response(db, query, format, f"expenses-{date.today().isoformat()}")
+
 # 📄 Get all expenses
 @router.get("/expenses", response_model=list[ExpenseResponse])
 async def get_expenses(
     trip_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     user_id: int = Security(get_current_user_id),
 ):
     res = await db.execute(
@@ -99,16 +167,135 @@ async def get_expenses(
 # 📄 Get all expenses for user (past records)
 @router.get("/all-expenses", response_model=list[ExpenseResponse])
 async def get_all_expenses(
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_db),
     user_id: int = Security(get_current_user_id),
 ):
-    """Get all expenses for the user across all trips."""
+    """Get all expenses for the user across all trips, newest first (keyset paginated)."""
+    return await paginate(
+        db, select(Expense).where(Expense.user_id == user_id),
+        page, response, Expense.date, Expense.id,
+    )
+
+
+def _remaining(budget, spent: float):
+    return round(float(budget) - spent, 2) if budget is not None else None
+
+
+def _burn_rate(spent: float, duration, start_date, end_date, by_day: list, today: Optional[date] = None) -> tuple:
+    """
+    (days elapsed, spend per day, projected total) for a trip. Days run from
+    the trip start to today or its end; undated trips span their first to
+    last expense day. Never more days than the trip lasts, and the projection
+    never falls below what is already spent.
+    """
+    today = today or date.today()
+    if start_date is not None:
+        start = start_date
+        end = min(today, end_date) if end_date else today
+    else:
+        start = by_day[0].date if by_day else today
+        end = by_day[-1].date if by_day else today
+    days_elapsed = max(1, (end - start).days + 1)
+    if duration:
+        days_elapsed = min(days_elapsed, duration)
+
+    burn_rate = spent / days_elapsed
+    projected = round(max(spent, burn_rate * duration), 2) if duration else None
+    return days_elapsed, round(burn_rate, 2), projected
+
+
+# 📊 Spend per trip
+@router.get("/summary", response_model=list[TripSpend])
+async def get_budget_summary(
+    db: AsyncSession = Depends(get_read_db),
+    user_id: int = Security(get_current_user_id),
+):
+    """Total spent and budget remaining for each of the user's trips."""
     res = await db.execute(
-        select(Expense)
-        .where(Expense.user_id == user_id)
-        .order_by(Expense.date.desc())
+        select(Trip.id, Trip.destination, Trip.budget, TripRollup.total, TripRollup.count)
+        .outerjoin(TripRollup, and_(
+            TripRollup.trip_id == Trip.id,
+            TripRollup.user_id == user_id,
+            TripRollup.dimension == rollups.TRIP,
+        ))
+        .where(Trip.user_id == user_id)
+        .order_by(Trip.created_at.desc(), Trip.id.desc())
+    )
+    return [
+        TripSpend(
+            trip_id=trip_id,
+            destination=destination,
+            budget=float(budget) if budget is not None else None,
+            spent=round(total or 0, 2),
+            remaining=_remaining(budget, total or 0),
+            expense_count=count or 0,
+        )
+        for trip_id, destination, budget, total, count in res.all()
+    ]
+
+
+# 📊 Breakdown for one trip
+@router.get("/summary/{trip_id}", response_model=BudgetSummary)
+async def get_trip_budget_summary(
+    trip_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    user_id: int = Security(get_current_user_id),
+):
+    """
+    Category and day breakdowns, budget remaining and burn rate for a trip,
+    read from its rollup rows instead of summing every expense.
+    """
+    res = await db.execute(
+        select(
+            Trip.destination,
+            Trip.budget,
+            Trip.duration,
+            Trip.start_date,
+            Trip.end_date,
+            TripRollup.dimension,
+            TripRollup.key,
+            TripRollup.total,
+            TripRollup.count,
+        )
+        .outerjoin(TripRollup, and_(
+            TripRollup.trip_id == Trip.id,
+            TripRollup.user_id == user_id,
+            TripRollup.count > 0,
+        ))
+        .where(Trip.id == trip_id, Trip.user_id == user_id)
+    )
+    rows = res.all()
+    if not rows:
+        raise HTTPException(status_code=404, detail="Trip not found")
+
+    destination, budget, duration, start_date, end_date = rows[0][:5]
+    spent, count, by_category, by_day = 0.0, 0, [], []
+    for *_, dimension, key, total, n in rows:
+        if dimension == rollups.TRIP:
+            spent, count = round(total, 2), n
+        elif dimension == rollups.CATEGORY:
+            by_category.append(CategoryTotal(category=key, total=round(total, 2), count=n))
+        elif dimension == rollups.DAY:
+            by_day.append(DayTotal(date=date.fromisoformat(key), total=round(total, 2), count=n))
+    by_day.sort(key=lambda d: d.date)
+
+    days_elapsed, burn_rate, projected_total = _burn_rate(spent, duration, start_date, end_date, by_day)
+
+    return BudgetSummary(
+        trip_id=trip_id,
+        destination=destination,
+        budget=float(budget) if budget is not None else None,
+        spent=spent,
+        remaining=_remaining(budget, spent),
+        expense_count=count,
+        by_category=sorted(by_category, key=lambda c: c.total, reverse=True),
+        by_day=by_day,
+        days_elapsed=days_elapsed,
+        burn_rate_per_day=burn_rate,
+        projected_total=projected_total,
     )
-    return res.scalars().all()
 
 
 # 🗑️ Delete expense
@@ -116,13 +303,27 @@ async def get_all_expenses(
 async def delete_expense(
     expense_id: int,
     db: AsyncSession = Depends(get_db),
+    user_id: int = Security(get_current_user_id),
 ):
-    res = await db.execute(select(Expense).where(Expense.id == expense_id))
+    res = await db.execute(
+        select(Expense).where(Expense.id == expense_id, Expense.user_id == user_id)
+    )
     exp = res.scalar_one_or_none()
     if not exp:
-        return {"detail": "Expense not found"}
+        raise HTTPException(status_code=404, detail="Expense not found")
     await db.delete(exp)
+    await rollups.apply_expense(db, exp, sign=-1)
     await db.commit()
+
+    expense_audit.emit(
+        "expense.deleted",
+        user_id=user_id,
+        expense_id=exp.id,
+        trip_id=exp.trip_id,
+        place=exp.place,
+        amount=exp.amount,
+        category=exp.category,
+    )
     return {"status": "deleted"}
 
 
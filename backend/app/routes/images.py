@@ -0,0 +1,24 @@
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+
+from ..core.blob_store import blob_store, content_type_for
+
+router = APIRouter(prefix="/images", tags=["Images"])
+
+# Keys are content hashes, so a key's bytes never change
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.get("/{key}", name="get_image")
+async def get_image(key: str, request: Request):
+    """Serve a stored image. Public: keys are unguessable content hashes."""
+    path = blob_store.path(key)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    etag = f'"{key.split(".")[0]}"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    return FileResponse(path, media_type=content_type_for(key), headers=headers)
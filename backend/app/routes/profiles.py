@@ -0,0 +1,51 @@
+from enum import Enum
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse
+
+from ..core.profiling import ADMIN_PREFIX, profile_store, token_matches, to_speedscope
+
+
+class ProfileFormat(str, Enum):
+    collapsed = "collapsed"
+    speedscope = "speedscope"
+
+
+async def require_profile_token(x_profile_token: Optional[str] = Header(None)) -> None:
+    if not token_matches(x_profile_token):
+        # Indistinguishable from a missing route, so the admin surface is not advertised
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
+router = APIRouter(
+    prefix=ADMIN_PREFIX,
+    tags=["Admin"],
+    include_in_schema=False,
+    dependencies=[Depends(require_profile_token)]
+)
+
+
+@router.get("/")
+async def list_profiles():
+    """Stored request profiles, newest first."""
+    return await run_in_threadpool(profile_store.list)
+
+
+@router.get("/{profile_id}")
+async def get_profile(profile_id: str, format: ProfileFormat = ProfileFormat.collapsed):
+    """Download a profile as collapsed stacks, or as a speedscope JSON file."""
+    path = profile_store.path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    if format == ProfileFormat.collapsed:
+        return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.collapsed")
+
+    collapsed = await run_in_threadpool(path.read_text)
+    meta = await run_in_threadpool(profile_store.meta, profile_id)
+    return JSONResponse(
+        to_speedscope(profile_id, collapsed, meta.get("interval_ms", 1.0)),
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.speedscope.json"'},
+    )
@@ -1,11 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..models.todo import Todo
 from ..schemas.todo import TodoCreate, TodoUpdate, TodoOut
 from ..dependencies.auth import get_current_user_id
+from ..dependencies.pagination import PageParams, paginate
 
 router = APIRouter(
     prefix="/todos",
@@ -31,13 +32,15 @@ async def create_todo(
 
 @router.get("/", response_model=list[TodoOut])
 async def get_todos(
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_db),
     user_id: int = Depends(get_current_user_id),
 ):
-    result = await db.execute(
-        select(Todo).where(Todo.user_id == user_id)
+    return await paginate(
+        db, select(Todo).where(Todo.user_id == user_id),
+        page, response, Todo.created_at, Todo.id,
     )
-    return result.scalars().all()
 
 
 @router.patch("/{todo_id}", response_model=TodoOut)
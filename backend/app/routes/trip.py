@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import defer
 
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..models.trip import Trip
-from ..schemas.trip import TripCreate, TripResponse
+from ..schemas.trip import TripCreate, TripResponse, TripSummary, ItineraryResponse
 from ..dependencies.auth import get_current_user_id
+from ..dependencies.pagination import PageParams, paginate
+from ..core.export import ExportFormat, export_response
 
 router = APIRouter(prefix="/trip", tags=["Trip"])
 
@@ -39,19 +44,25 @@ async def create_or_update_trip(
     await db.refresh(trip)
     return trip
 
-@router.get("/", response_model=list[TripResponse])
+def _trip_summaries(user_id: int):
+    # Itinerary text stays in the database (and in TOAST); fetch it per trip
+    return select(Trip).where(Trip.user_id == user_id).options(defer(Trip.itinerary, raiseload=True))
+
+@router.get("/", response_model=list[TripSummary])
 async def get_trips(
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_db),
     user_id: int = Depends(get_current_user_id),
 ):
-    result = await db.execute(
-        select(Trip).where(Trip.user_id == user_id)
+    return await paginate(
+        db, _trip_summaries(user_id),
+        page, response, Trip.created_at, Trip.id,
     )
-    return result.scalars().all()
 
 @router.get("/active", response_model=TripResponse)
 async def get_active_trip(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     user_id: int = Depends(get_current_user_id),
 ):
     result = await db.execute(
@@ -67,6 +78,47 @@ async def get_active_trip(
 
     return trip
 
+@router.get("/export")
+async def export_trips(
+    format: ExportFormat = ExportFormat.csv,
+    db: AsyncSession = Depends(get_read_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    """Download all of the user's trips, itineraries included, streamed as CSV or NDJSON."""
+    query = (
+        select(
+            Trip.id,
+            Trip.destination,
+            Trip.duration,
+            Trip.travelers,
+            Trip.budget,
+            Trip.trip_styles,
+            Trip.start_date,
+            Trip.end_date,
+            Trip.created_at,
+            Trip.itinerary,
+        )
+        .where(Trip.user_id == user_id)
+        .order_by(Trip.created_at.desc(), Trip.id.desc())
+    )
+    return export_response(db, query, format, f"trips-{date.today().isoformat()}")
+
+@router.get("/{trip_id}/itinerary", response_model=ItineraryResponse)
+async def get_trip_itinerary(
+    trip_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    result = await db.execute(
+        select(Trip.itinerary).where(Trip.id == trip_id, Trip.user_id == user_id)
+    )
+    row = result.first()
+
+    if row is None:
+        raise HTTPException(status_code=404, detail="Trip not found")
+
+    return ItineraryResponse(trip_id=trip_id, itinerary=row.itinerary)
+
 @router.get("/{trip_id}", response_model=TripResponse)
 async def get_trip(trip_id, db: AsyncSession = Depends(get_db)):
     result = await db.execute(
@@ -79,15 +131,15 @@ async def get_trip(trip_id, db: AsyncSession = Depends(get_db)):
 
     return trip
 
-@router.get("/past/all", response_model=list[TripResponse])
+@router.get("/past/all", response_model=list[TripSummary])
 async def get_past_trips(
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_db),
     user_id: int = Depends(get_current_user_id),
 ):
-    """Get all trips (past and current) for the user with their itineraries."""
-    result = await db.execute(
-        select(Trip)
-        .where(Trip.user_id == user_id)
-        .order_by(Trip.created_at.desc())
+    """Get all trips (past and current) for the user, keyset paginated. Itineraries via /trip/{id}/itinerary."""
+    return await paginate(
+        db, _trip_summaries(user_id),
+        page, response, Trip.created_at, Trip.id,
     )
-    return result.scalars().all()
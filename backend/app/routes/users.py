@@ -1,94 +1,208 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import logging
+import re
+from typing import NamedTuple, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, func, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..models.user import User
 from ..models.profile_picture import ProfilePicture
 from ..dependencies.auth import get_current_user_id
+from ..dependencies.uploads import UploadedFile, image_upload
+from ..core.cache import profile_cache
+from ..core.images import StoredImage, decode_data_url, release_profile_image, store_profile_image
 from ..schemas.user import ProfileResponse, UpdateProfileRequest
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(
     prefix="/users",
     tags=["Users"]
 )
 
-@router.get("/me", response_model=ProfileResponse)
-async def get_my_profile(
-    user_id: int = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db)
-):
-    user_result = await db.execute(select(User).where(User.id == user_id))
-    user = user_result.scalars().first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+# Our own image URLs, as returned in profiles and sent back unchanged by the client
+IMAGE_URL_KEY = re.compile(r"/images/([0-9a-f]{64}\.[a-z0-9]{2,5})$")
+
+
+class Profile(NamedTuple):
+    id: int
+    name: str
+    email: str
+    is_active: bool
+    image_key: Optional[str] = None
+    thumbnails: Optional[dict] = None
+    image_url: Optional[str] = None
+
+
+USER_COLUMNS = (User.id, User.name, User.email, User.is_active)
+PICTURE_COLUMNS = (ProfilePicture.image_key, ProfilePicture.thumbnails, ProfilePicture.image_url)
+PICTURE_FIELDS = ("image_key", "thumbnails", "image_url")
 
-    pic_result = await db.execute(
-        select(ProfilePicture.image_url).where(ProfilePicture.user_id == user_id).order_by(ProfilePicture.id.desc())
+
+async def _fetch_profile(db: AsyncSession, user_id: int) -> Optional[Profile]:
+    """User and profile picture in one query."""
+    result = await db.execute(
+        select(*USER_COLUMNS, *PICTURE_COLUMNS)
+        .outerjoin(ProfilePicture, ProfilePicture.user_id == User.id)
+        .where(User.id == user_id)
+    )
+    row = result.first()
+    return Profile(*row) if row is not None else None
+
+
+async def _upsert_picture(db: AsyncSession, user_id: int, stored: Optional[StoredImage] = None, image_url: Optional[str] = None) -> tuple:
+    """Set (or with no arguments, clear) the user's single picture row. Returns the picture columns."""
+    if stored is None and not image_url:
+        await db.execute(delete(ProfilePicture).where(ProfilePicture.user_id == user_id))
+        return None, None, None
+
+    values = {
+        "image_key": stored.key if stored is not None else None,
+        "thumbnails": stored.thumbnails if stored is not None else None,
+        "image_url": None if stored is not None else image_url,
+    }
+    stmt = insert(ProfilePicture).values(user_id=user_id, **values)
+    result = await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[ProfilePicture.user_id],
+            set_={**values, "created_at": func.now()},
+        ).returning(*PICTURE_COLUMNS)
     )
-    image_url = pic_result.scalar()
+    return tuple(result.one())
+
+
+async def _discard_stored(db: AsyncSession, stored: Optional[StoredImage]) -> None:
+    """Roll back a failed update and drop the blobs it stored, unless another profile uses them."""
+    await db.rollback()
+    if stored is not None:
+        await release_profile_image(db, stored.key, stored.thumbnails)
+
+
+def _profile_response(request: Request, profile: Profile) -> ProfileResponse:
+    image_url, thumbnails = profile.image_url, {}
+    if profile.image_key:
+        image_url = str(request.url_for("get_image", key=profile.image_key))
+        thumbnails = {
+            size: str(request.url_for("get_image", key=key))
+            for size, key in (profile.thumbnails or {}).items()
+        }
 
     return ProfileResponse(
-        id=user.id,
-        name=user.name,
-        email=user.email,
-        is_active=user.is_active,
-        profile_image_url=image_url
+        id=profile.id,
+        name=profile.name,
+        email=profile.email,
+        is_active=profile.is_active,
+        profile_image_url=image_url,
+        profile_thumbnails=thumbnails,
     )
 
 
+@router.get("/me", response_model=ProfileResponse)
+async def get_my_profile(
+    request: Request,
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_read_db)
+):
+    # Called on every page load; served from the per-worker cache when fresh
+    profile = profile_cache.get(user_id)
+    if profile is None:
+        profile = await _fetch_profile(db, user_id)
+        if profile is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        profile_cache.set(user_id, profile)
+
+    return _profile_response(request, profile)
+
+
 @router.put("/me", response_model=ProfileResponse)
 async def update_my_profile(
+    request: Request,
     payload: UpdateProfileRequest,
     user_id: int = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
-    print(f"[UPDATE PROFILE] User {user_id}")
-    print(f"[UPDATE PROFILE] Payload name: {payload.name}")
-    print(f"[UPDATE PROFILE] Payload email: {payload.email}")
-    print(f"[UPDATE PROFILE] Payload profile_image_url: {payload.profile_image_url}")
-    print(f"[UPDATE PROFILE] profile_image_url length: {len(payload.profile_image_url) if payload.profile_image_url else 0}")
-    
-    # Fetch current user
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalars().first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    logger.debug(
+        "update profile",
+        extra={"user_id": user_id, "image_url_length": len(payload.profile_image_url or "")},
+    )
 
-    # If email is changing, ensure it's not taken by someone else
-    if payload.email.lower() != user.email.lower():
-        email_check = await db.execute(select(User).where(User.email == payload.email.lower()))
-        if email_check.scalars().first():
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already in use")
+    # Profile picture: a new data URL is decoded into the blob store (before the
+    # transaction starts); the URL we returned earlier means "unchanged"; empty clears it
+    image_url = payload.profile_image_url
+    own_key = IMAGE_URL_KEY.search(image_url) if image_url else None
+    stored = None
+    if image_url and image_url.startswith("data:"):
+        stored = await store_profile_image(decode_data_url(image_url))
 
-    user.name = payload.name
-    user.email = payload.email.lower()
+    # Update the user and read back the current picture in one statement;
+    # the unique email index rejects addresses taken by someone else
+    try:
+        result = await db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(name=payload.name, email=payload.email.lower())
+            .returning(*USER_COLUMNS, *(
+                select(column).where(ProfilePicture.user_id == User.id).scalar_subquery()
+                for column in PICTURE_COLUMNS
+            ))
+        )
+    except IntegrityError:
+        await _discard_stored(db, stored)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already in use")
+    row = result.first()
+    if row is None:
+        await _discard_stored(db, stored)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    profile = previous = Profile(*row)
 
-    # Upsert profile picture URL in separate table
-    if payload.profile_image_url:
-        print(f"[UPDATE PROFILE] Saving profile image URL to database")
-        # Remove existing rows to keep latest single record
-        await db.execute(delete(ProfilePicture).where(ProfilePicture.user_id == user_id))
-        db.add(ProfilePicture(user_id=user_id, image_url=payload.profile_image_url))
-    else:
-        print(f"[UPDATE PROFILE] No profile_image_url, clearing existing")
-        # Optional: clear profile picture if empty string provided
-        await db.execute(delete(ProfilePicture).where(ProfilePicture.user_id == user_id))
+    picture = None
+    if own_key:
+        if profile.image_key != own_key.group(1):
+            await _discard_stored(db, stored)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unknown profile image")
+    elif stored is not None:
+        picture = await _upsert_picture(db, user_id, stored=stored)
+    elif not image_url:
+        if profile.image_key or profile.image_url:
+            picture = await _upsert_picture(db, user_id)
+    elif image_url != profile.image_url:
+        picture = await _upsert_picture(db, user_id, image_url=image_url)
+    if picture is not None:
+        profile = profile._replace(**dict(zip(PICTURE_FIELDS, picture)))
 
     await db.commit()
-    await db.refresh(user)
+    profile_cache.set(user_id, profile)
+    if previous.image_key != profile.image_key:
+        await release_profile_image(db, previous.image_key, previous.thumbnails)
 
-    # Get latest image url
-    pic_result = await db.execute(
-        select(ProfilePicture.image_url).where(ProfilePicture.user_id == user_id).order_by(ProfilePicture.id.desc())
-    )
-    image_url = pic_result.scalar()
-    print(f"[UPDATE PROFILE] Retrieved image_url from DB: {image_url}")
+    return _profile_response(request, profile)
 
-    return ProfileResponse(
-        id=user.id,
-        name=user.name,
-        email=user.email,
-        is_active=user.is_active,
-        profile_image_url=image_url
-    )
+
+@router.put("/me/picture", response_model=ProfileResponse)
+async def upload_my_picture(
+    request: Request,
+    upload: UploadedFile = Depends(image_upload()),
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Replace the profile picture with a multipart image upload (field "file")."""
+    previous = await _fetch_profile(db, user_id)
+    if previous is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    stored = await store_profile_image(upload.source)
+    try:
+        picture = await _upsert_picture(db, user_id, stored=stored)
+    except IntegrityError:
+        await _discard_stored(db, stored)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    profile = previous._replace(**dict(zip(PICTURE_FIELDS, picture)))
+    await db.commit()
+    profile_cache.set(user_id, profile)
+    if previous.image_key != profile.image_key:
+        await release_profile_image(db, previous.image_key, previous.thumbnails)
+
+    return _profile_response(request, profile)
@@ -29,6 +29,7 @@ class OCRResponse(BaseModel):
     confidence_level: str  # "very high", "high", "moderate", "low", "very low"
     character_count: int
     word_count: int
+    ocr_tier: Optional[str] = None  # Escalation tier that produced the text ("native", "enhanced", "full")
     error: Optional[str] = None
 
 
@@ -66,4 +67,5 @@ class ReceiptScanResponse(BaseModel):
     category_confidence: float  # 0-100 confidence in category
     category_scores: Dict[str, int]  # Scores for each category
     detected_date: Optional[str] = None  # ISO date (YYYY-MM-DD) if found
+    ocr_tier: Optional[str] = None  # Escalation tier that produced the text
     error: Optional[str] = None
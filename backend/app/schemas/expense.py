@@ -11,8 +11,53 @@ class ExpenseCreate(BaseModel):
     source: Optional[str] = "manual"
     ocr_confidence: Optional[float] = None  # Confidence score from OCR (0-100)
 
+# Aliased: inside a model with a `date` field, the annotation would resolve to the field
+OptionalDate = Optional[date]
+
+
 class ExpenseResponse(ExpenseCreate):
     id: int
+    date: OptionalDate = None  # the column is nullable (imports, rows from before date was required)
 
     class Config:
         from_attributes = True
+
+
+class CategoryTotal(BaseModel):
+    category: str
+    total: float
+    count: int
+
+
+class DayTotal(BaseModel):
+    date: date
+    total: float
+    count: int
+
+
+class TripSpend(BaseModel):
+    trip_id: int
+    destination: str
+    budget: Optional[float] = None
+    spent: float
+    remaining: Optional[float] = None
+    expense_count: int
+
+
+class BudgetSummary(TripSpend):
+    by_category: list[CategoryTotal]
+    by_day: list[DayTotal]
+    days_elapsed: int
+    burn_rate_per_day: float
+    projected_total: Optional[float] = None
+
+
+class RowError(BaseModel):
+    row: int                 # 1-based position in the JSON array / CSV data rows
+    errors: list[str]
+
+
+class BulkImportResult(BaseModel):
+    created: int
+    ids: list[int]
+    errors: list[RowError]
@@ -2,7 +2,7 @@ from pydantic import BaseModel
 from typing import List, Optional
 from datetime import date
 
-class TripCreate(BaseModel):
+class TripBase(BaseModel):
     destination: str
     duration: int
     travelers: int
@@ -10,6 +10,8 @@ class TripCreate(BaseModel):
     trip_styles: List[str] = []
     start_date: Optional[date] = None
     end_date: Optional[date] = None
+
+class TripCreate(TripBase):
     itinerary: Optional[str] = None
 
 class TripResponse(TripCreate):
@@ -17,3 +19,15 @@ class TripResponse(TripCreate):
 
     class Config:
         from_attributes = True
+
+class TripSummary(TripBase):
+    """Trip without its itinerary text, for list endpoints."""
+    id: int
+    has_itinerary: bool = False
+
+    class Config:
+        from_attributes = True
+
+class ItineraryResponse(BaseModel):
+    trip_id: int
+    itinerary: Optional[str] = None
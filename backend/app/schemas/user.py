@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, Optional
 from pydantic import BaseModel, EmailStr
 
 class SignupRequest(BaseModel):
@@ -22,6 +22,11 @@ class UserResponse(BaseModel):
         from_attributes = True
 
 
+class ChangePasswordRequest(BaseModel):
+    current_password: str
+    new_password: str
+
+
 class UpdateProfileRequest(BaseModel):
     name: str
     email: EmailStr
@@ -34,6 +39,8 @@ class ProfileResponse(BaseModel):
     email: EmailStr
     is_active: bool
     profile_image_url: Optional[str] = None
+    # Square thumbnails by size in px, e.g. {"64": url, "256": url}
+    profile_thumbnails: Dict[str, str] = {}
 
     class Config:
         from_attributes = True
@@ -0,0 +1,132 @@
+"""Initial auth, trip, todo, emergency and budget schemas
+
+Matches the tables previously created by Base.metadata.create_all at startup.
+Tables that already exist are left untouched, so databases created that way
+can be upgraded in place.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+SCHEMAS = ["auth", "trip", "todo", "emergency", "budget"]
+
+
+def _missing(table: str, schema: str) -> bool:
+    if context.is_offline_mode():
+        return True
+    return not sa.inspect(op.get_bind()).has_table(table, schema=schema)
+
+
+def upgrade() -> None:
+    for schema in SCHEMAS:
+        op.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+
+    if _missing("users", "auth"):
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(100), nullable=False),
+            sa.Column("email", sa.String(255), nullable=False),
+            sa.Column("password_hash", sa.String(), nullable=False),
+            sa.Column("is_active", sa.Boolean(), server_default=sa.text("true")),
+            sa.Column("created_at", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP")),
+            schema="auth",
+        )
+        op.create_index("ix_auth_users_id", "users", ["id"], schema="auth")
+        op.create_index("ix_auth_users_email", "users", ["email"], unique=True, schema="auth")
+
+    if _missing("profile_pictures", "auth"):
+        op.create_table(
+            "profile_pictures",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("auth.users.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("image_url", sa.Text(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP")),
+            schema="auth",
+        )
+        op.create_index("ix_auth_profile_pictures_id", "profile_pictures", ["id"], schema="auth")
+        op.create_index("ix_auth_profile_pictures_user_id", "profile_pictures", ["user_id"], schema="auth")
+
+    if _missing("trips", "trip"):
+        op.create_table(
+            "trips",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("auth.users.id"), nullable=False),
+            sa.Column("destination", sa.String(), nullable=False),
+            sa.Column("duration", sa.Integer(), nullable=False),
+            sa.Column("travelers", sa.Integer(), nullable=False),
+            sa.Column("budget", sa.Numeric(10, 2)),
+            sa.Column("trip_styles", postgresql.ARRAY(sa.String())),
+            sa.Column("start_date", sa.Date()),
+            sa.Column("end_date", sa.Date()),
+            sa.Column("itinerary", sa.Text()),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            schema="trip",
+        )
+        op.create_index("ix_trip_trips_id", "trips", ["id"], schema="trip")
+
+    if _missing("todos", "todo"):
+        op.create_table(
+            "todos",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("auth.users.id"), nullable=False),
+            sa.Column("title", sa.String(255), nullable=False),
+            sa.Column("description", sa.String()),
+            sa.Column("category", sa.String(50)),
+            sa.Column("group", sa.String(50)),
+            sa.Column("priority", sa.String(20)),
+            sa.Column("due_at", sa.DateTime(timezone=True)),
+            sa.Column("remind_at", sa.DateTime(timezone=True)),
+            sa.Column("is_done", sa.Boolean()),
+            sa.Column("is_important", sa.Boolean()),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            schema="todo",
+        )
+        op.create_index("ix_todo_todos_id", "todos", ["id"], schema="todo")
+
+    if _missing("emergency_contact", "emergency"):
+        op.create_table(
+            "emergency_contact",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("auth.users.id"), nullable=False),
+            sa.Column("name", sa.String(100), nullable=False),
+            sa.Column("phone", sa.String(20), nullable=False),
+            sa.Column("relation", sa.String(50)),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            schema="emergency",
+        )
+        op.create_index("ix_emergency_emergency_contact_id", "emergency_contact", ["id"], schema="emergency")
+
+    if _missing("expenses", "budget"):
+        op.create_table(
+            "expenses",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("auth.users.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("trip_id", sa.Integer(), sa.ForeignKey("trip.trips.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("place", sa.String(), nullable=False),
+            sa.Column("amount", sa.Float(), nullable=False),
+            sa.Column("category", sa.String(), nullable=False),
+            sa.Column("date", sa.Date(), server_default=sa.func.current_date()),
+            sa.Column("source", sa.String()),
+            schema="budget",
+        )
+        op.create_index("ix_budget_expenses_id", "expenses", ["id"], schema="budget")
+
+
+def downgrade() -> None:
+    op.drop_table("expenses", schema="budget")
+    op.drop_table("emergency_contact", schema="emergency")
+    op.drop_table("todos", schema="todo")
+    op.drop_table("trips", schema="trip")
+    op.drop_table("profile_pictures", schema="auth")
+    op.drop_table("users", schema="auth")
@@ -0,0 +1,42 @@
+"""Composite indexes for per-user list queries
+
+Every list route filters by user_id and sorts newest first. Indexes are
+built CONCURRENTLY so the release step does not block writes on large tables.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# (index name, table, schema, columns)
+INDEXES = [
+    ("ix_budget_expenses_user_trip_date", "expenses", "budget", ["user_id", "trip_id", "date", "id"]),
+    ("ix_budget_expenses_user_date", "expenses", "budget", ["user_id", "date", "id"]),
+    ("ix_trip_trips_user_created", "trips", "trip", ["user_id", "created_at", "id"]),
+    ("ix_todo_todos_user_created", "todos", "todo", ["user_id", "created_at", "id"]),
+    ("ix_emergency_emergency_contact_user_id", "emergency_contact", "emergency", ["user_id"]),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, schema, columns in INDEXES:
+            op.create_index(
+                name, table, columns, schema=schema,
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, schema, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table, schema=schema,
+                postgresql_concurrently=True, if_exists=True,
+            )
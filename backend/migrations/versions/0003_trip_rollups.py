@@ -0,0 +1,46 @@
+"""Per-trip expense rollups
+
+Running totals per trip, category and day, maintained by the expense routes.
+Backfilled from existing expenses here; `python -m app.budget.rollups rebuild`
+recomputes them later if needed.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "trip_rollups",
+        sa.Column("trip_id", sa.Integer(), sa.ForeignKey("trip.trips.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("auth.users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("dimension", sa.String(16), nullable=False),
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("total", sa.Float(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("trip_id", "user_id", "dimension", "key"),
+        schema="budget",
+    )
+    op.execute("LOCK TABLE budget.expenses IN SHARE MODE")
+    op.execute("""
+        INSERT INTO budget.trip_rollups (trip_id, user_id, dimension, key, total, count)
+        SELECT trip_id, user_id,
+               CASE grouping(category, date) WHEN 3 THEN 'trip' WHEN 1 THEN 'category' ELSE 'day' END,
+               CASE grouping(category, date) WHEN 3 THEN '' WHEN 1 THEN category ELSE date::text END,
+               sum(amount), count(*)
+        FROM budget.expenses
+        GROUP BY trip_id, user_id, GROUPING SETS ((category), (date), ())
+        HAVING grouping(category, date) <> 2 OR date IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table("trip_rollups", schema="budget")
@@ -0,0 +1,46 @@
+"""Out-of-line, compressed itinerary storage
+
+Itineraries are kilobytes of text while the rest of a trip row is ~100 bytes.
+A low toast_tuple_target moves them into the TOAST table (compressed) even
+when they are under the default ~2KB threshold, so scans for trip lists read
+small heap rows and never touch itinerary pages. On PostgreSQL 14+ built with
+lz4, new itineraries use lz4 instead of pglz (faster to compress and read).
+Existing values keep their current compression until rewritten.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+TOAST_TUPLE_TARGET = 256
+
+
+def _supports_lz4() -> bool:
+    if context.is_offline_mode():
+        return False
+    bind = op.get_bind()
+    if bind.dialect.server_version_info < (14,):
+        return False
+    values = bind.execute(sa.text(
+        "SELECT enumvals FROM pg_settings WHERE name = 'default_toast_compression'"
+    )).scalar()
+    return "lz4" in (values or [])
+
+
+def upgrade() -> None:
+    op.execute(f"ALTER TABLE trip.trips SET (toast_tuple_target = {TOAST_TUPLE_TARGET})")
+    if _supports_lz4():
+        op.execute("ALTER TABLE trip.trips ALTER COLUMN itinerary SET COMPRESSION lz4")
+
+
+def downgrade() -> None:
+    if _supports_lz4():
+        op.execute("ALTER TABLE trip.trips ALTER COLUMN itinerary SET COMPRESSION default")
+    op.execute("ALTER TABLE trip.trips RESET (toast_tuple_target)")
@@ -0,0 +1,32 @@
+"""Profile pictures in the blob store
+
+Pictures are stored as files keyed by content hash; rows keep only the keys.
+image_url stays for data URLs saved earlier (moved by
+`python -m app.core.images backfill`) and external image URLs.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("profile_pictures", sa.Column("image_key", sa.String(80), nullable=True), schema="auth")
+    op.add_column("profile_pictures", sa.Column("thumbnails", postgresql.JSONB(), nullable=True), schema="auth")
+    op.alter_column("profile_pictures", "image_url", existing_type=sa.Text(), nullable=True, schema="auth")
+
+
+def downgrade() -> None:
+    # Pictures that only exist in the blob store cannot be represented any more
+    op.execute("DELETE FROM auth.profile_pictures WHERE image_url IS NULL")
+    op.alter_column("profile_pictures", "image_url", existing_type=sa.Text(), nullable=False, schema="auth")
+    op.drop_column("profile_pictures", "thumbnails", schema="auth")
+    op.drop_column("profile_pictures", "image_key", schema="auth")
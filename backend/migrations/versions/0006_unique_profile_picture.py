@@ -0,0 +1,30 @@
+"""One profile picture row per user
+
+Profile updates upsert on user_id, which needs a unique index. Older
+duplicate rows are dropped, keeping each user's newest picture.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        DELETE FROM auth.profile_pictures p
+        USING auth.profile_pictures newer
+        WHERE newer.user_id = p.user_id AND newer.id > p.id
+    """)
+    op.drop_index("ix_auth_profile_pictures_user_id", table_name="profile_pictures", schema="auth")
+    op.create_index("ix_auth_profile_pictures_user_id", "profile_pictures", ["user_id"], unique=True, schema="auth")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_auth_profile_pictures_user_id", table_name="profile_pictures", schema="auth")
+    op.create_index("ix_auth_profile_pictures_user_id", "profile_pictures", ["user_id"], schema="auth")
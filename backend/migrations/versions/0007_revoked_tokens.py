@@ -0,0 +1,33 @@
+"""Access token revocations
+
+Logout revokes one token, a password change every token issued before it.
+Workers keep the list in memory and poll for recently created rows.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "revoked_tokens",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("auth.users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("token_hash", sa.String(64), nullable=True),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("CURRENT_TIMESTAMP")),
+        schema="auth",
+    )
+    op.create_index("ix_auth_revoked_tokens_expires_at", "revoked_tokens", ["expires_at"], schema="auth")
+
+
+def downgrade() -> None:
+    op.drop_table("revoked_tokens", schema="auth")
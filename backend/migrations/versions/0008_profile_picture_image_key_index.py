@@ -0,0 +1,24 @@
+"""Index profile pictures by blob key
+
+Replacing or clearing a picture deletes its blobs once no other row
+references the same key (identical uploads share one blob), which looks
+rows up by image_key.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_auth_profile_pictures_image_key", "profile_pictures", ["image_key"], schema="auth")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_auth_profile_pictures_image_key", table_name="profile_pictures", schema="auth")
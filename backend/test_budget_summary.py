@@ -0,0 +1,60 @@
+"""
+Unit tests for the trip budget summary's burn rate and projection: undated
+trips, trips that have ended and trips still under way. No database needed.
+
+    python -m pytest -q backend/test_budget_summary.py
+"""
+
+import os
+import sys
+from datetime import date
+from pathlib import Path
+
+# Setup path
+sys.path.insert(0, str(Path(__file__).parent))
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://localhost/unused")
+
+from app.routes.expense import _burn_rate  # type: ignore
+from app.schemas.expense import DayTotal  # type: ignore
+
+TODAY = date(2026, 10, 19)
+
+
+def _days(*dates):
+    return [DayTotal(date=d, total=0.0, count=1) for d in dates]
+
+
+def test_undated_trip_spans_first_to_last_expense():
+    # Months after the last expense, the rate is still over the days with spending
+    by_day = _days(date(2026, 6, 1), date(2026, 6, 3))
+    assert _burn_rate(450.0, 5, None, None, by_day, TODAY) == (3, 150.0, 750.0)
+
+
+def test_ended_trip_is_clamped_to_its_duration():
+    by_day = _days(date(2026, 9, 1), date(2026, 9, 5))
+    # Trip dates cover more days than its duration
+    assert _burn_rate(450.0, 5, date(2026, 9, 1), date(2026, 9, 10), by_day, TODAY) == (5, 90.0, 450.0)
+    # No end date: counted up to today, but never beyond the trip's length
+    assert _burn_rate(450.0, 5, date(2026, 9, 1), None, by_day, TODAY) == (5, 90.0, 450.0)
+
+
+def test_trip_in_progress():
+    by_day = _days(date(2026, 10, 18), date(2026, 10, 19))
+    assert _burn_rate(200.0, 10, date(2026, 10, 16), date(2026, 10, 25), by_day, TODAY) == (4, 50.0, 500.0)
+
+
+def test_projection_never_below_spent():
+    # Spending all on day one of a future-dated trip
+    by_day = _days(date(2026, 10, 19))
+    days, rate, projected = _burn_rate(300.0, 3, date(2026, 11, 1), None, by_day, TODAY)
+    assert days == 1 and projected >= 300.0
+    assert _burn_rate(0.0, 3, None, None, [], TODAY) == (1, 0.0, 0.0)
+    assert _burn_rate(100.0, 0, None, None, by_day, TODAY) == (1, 100.0, None)
+
+
+if __name__ == "__main__":
+    test_undated_trip_spans_first_to_last_expense()
+    test_ended_trip_is_clamped_to_its_duration()
+    test_trip_in_progress()
+    test_projection_never_below_spent()
+    print("budget summary tests passed")
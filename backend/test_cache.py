@@ -0,0 +1,59 @@
+"""
+Unit tests for TTLCache: expiry, LRU eviction and the disabled setting.
+No database needed.
+
+    python -m pytest -q backend/test_cache.py
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Setup path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.core import cache  # type: ignore
+from app.core.cache import TTLCache  # type: ignore
+
+
+def test_ttl_cache_expiry():
+    now = [1000.0]
+    real_time = cache.time
+    cache.time = SimpleNamespace(monotonic=lambda: now[0])
+    try:
+        ttl_cache = TTLCache(maxsize=10, ttl=30)
+        ttl_cache.set("a", 1)
+        ttl_cache.set("b", 2, ttl=5)
+        now[0] += 10
+        assert ttl_cache.get("a") == 1
+        assert ttl_cache.get("b") is None
+        now[0] += 25
+        assert ttl_cache.get("a", "missing") == "missing"
+        assert len(ttl_cache) == 0
+        assert (ttl_cache.hits, ttl_cache.misses) == (1, 2)
+    finally:
+        cache.time = real_time
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    ttl_cache = TTLCache(maxsize=2, ttl=30)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+    assert ttl_cache.get("a") == 1
+    ttl_cache.set("c", 3)
+    assert ttl_cache.get("b") is None
+    assert ttl_cache.get("a") == 1
+    assert ttl_cache.get("c") == 3
+
+
+def test_ttl_cache_disabled():
+    ttl_cache = TTLCache(maxsize=10, ttl=0)
+    ttl_cache.set("a", 1)
+    assert ttl_cache.get("a") is None
+
+
+if __name__ == "__main__":
+    test_ttl_cache_expiry()
+    test_ttl_cache_evicts_least_recently_used()
+    test_ttl_cache_disabled()
+    print("cache tests passed")
@@ -0,0 +1,97 @@
+"""
+Unit tests for the sliding-window rate limiter.
+Covers Retry-After arithmetic, window rollover of the in-process counters,
+and that rejected requests are not counted. No database or Redis needed.
+
+    python -m pytest -q backend/test_rate_limit.py
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Setup path
+sys.path.insert(0, str(Path(__file__).parent))
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://localhost/unused")
+
+from fastapi import HTTPException  # type: ignore
+
+from app.dependencies import rate_limit  # type: ignore
+from app.dependencies.rate_limit import LocalCounters, SlidingWindowLimiter, _retry_after  # type: ignore
+
+
+def test_retry_after():
+    # Current window full: wait for the next window, then for enough of this one to slide out
+    assert _retry_after(0, 10, 30, 10, 60) == 36
+    assert _retry_after(4, 5, 15, 5, 60) == 57
+    # Room in this window: wait for enough of the previous one to slide out
+    assert _retry_after(10, 2, 15, 5, 60) == 33
+
+
+def test_local_counters_rollover():
+    counters = LocalCounters()
+
+    async def run():
+        assert await counters.incr("k", 100, 60) == (0, 1)
+        assert await counters.incr("k", 100, 60) == (0, 2)
+        # Next window: the current count becomes the previous one
+        assert await counters.incr("k", 101, 60) == (2, 1)
+        # A skipped window resets both
+        assert await counters.incr("k", 103, 60) == (0, 1)
+
+    asyncio.run(run())
+
+
+def test_local_counters_evict_least_recently_used():
+    counters = LocalCounters(max_keys=2)
+
+    async def run():
+        await counters.incr("a", 100, 60)
+        await counters.incr("b", 100, 60)
+        await counters.incr("a", 100, 60)
+        await counters.incr("c", 100, 60)
+        assert await counters.incr("a", 100, 60) == (0, 3)
+        assert await counters.incr("b", 100, 60) == (0, 1)
+
+    asyncio.run(run())
+
+
+def test_rejected_requests_are_not_counted():
+    limiter = SlidingWindowLimiter("test", "2/60")
+    now = [6015.0]  # window 100, 15s in
+    real_time = rate_limit.time
+    rate_limit.time = SimpleNamespace(time=lambda: now[0])
+    rate_limit.local_counters.clear()
+    try:
+        async def run():
+            await limiter.hit("client")
+            await limiter.hit("client")
+            try:
+                await limiter.hit("client")
+            except HTTPException as e:
+                assert e.status_code == 429
+                assert e.headers["Retry-After"] == "75"
+            else:
+                raise AssertionError("third request was admitted")
+            assert limiter.rejected == 1
+            assert await rate_limit.local_counters.incr("test:client", 100, 60) == (0, 3)
+            await rate_limit.local_counters.decr("test:client", 100)
+
+            # Admitted once Retry-After has passed, which only holds if the rejection was not counted
+            now[0] += 75
+            await limiter.hit("client")
+
+        asyncio.run(run())
+    finally:
+        rate_limit.time = real_time
+        rate_limit.local_counters.clear()
+
+
+if __name__ == "__main__":
+    test_retry_after()
+    test_local_counters_rollover()
+    test_local_counters_evict_least_recently_used()
+    test_rejected_requests_are_not_counted()
+    print("rate limit tests passed")
@@ -0,0 +1,42 @@
+"""
+Unit tests for the in-memory token revocation list: revoked token hashes and
+the per-user issued-before cutoff set by a password change. No database needed.
+
+    python -m pytest -q backend/test_token_revocation.py
+"""
+
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Setup path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.core.token_revocation import RevocationList  # type: ignore
+
+
+def test_revocation_list():
+    revocations = RevocationList()
+    changed_at = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+    expires_at = changed_at + timedelta(hours=1)
+    issued_before = changed_at.timestamp() - 1
+    issued_after = changed_at.timestamp() + 1
+
+    revocations._add(1, "logged-out", changed_at, expires_at)
+    assert revocations.is_revoked("logged-out", 2, issued_after)
+    assert not revocations.is_revoked("other", 1, issued_before)
+
+    # Password change: tokens issued before it are revoked, later ones are not
+    revocations._add(1, None, changed_at, expires_at)
+    assert revocations.is_revoked("other", 1, issued_before)
+    assert not revocations.is_revoked("other", 1, issued_after)
+    assert not revocations.is_revoked("other", 2, issued_before)
+
+    # An older password change does not move the cutoff back
+    revocations._add(1, None, changed_at - timedelta(minutes=5), expires_at)
+    assert revocations.is_revoked("other", 1, issued_before)
+
+
+if __name__ == "__main__":
+    test_revocation_list()
+    print("token revocation tests passed")
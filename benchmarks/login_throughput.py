@@ -0,0 +1,111 @@
+"""
+Benchmark login password verification on one worker's event loop.
+Runs concurrent logins with verification inline on the event loop (the old
+behaviour) and on the password hashing thread pool, and reports logins per
+second plus how long other requests on the same loop were stalled (measured
+by a 1 ms heartbeat task).
+
+Usage:
+    python benchmarks/login_throughput.py --logins 200 --concurrency 32 --rounds 29000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Setup path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+
+async def heartbeat(lags: list, stop: asyncio.Event) -> None:
+    """Sleep 1 ms at a time and record how late each wake-up was."""
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append((time.perf_counter() - t0) * 1000 - 1)
+
+
+async def run_logins(mode: str, logins: int, concurrency: int, stored_hash: str) -> dict:
+    from app.core import security  # type: ignore
+
+    async def login() -> None:
+        if mode == "inline":
+            ok = security.verify_password("correct horse", stored_hash)
+        else:
+            ok, _ = await security.verify_password_async("correct horse", stored_hash)
+        assert ok
+
+    lags: list = []
+    stop = asyncio.Event()
+    beat = asyncio.create_task(heartbeat(lags, stop))
+    gate = asyncio.Semaphore(concurrency)
+
+    async def limited() -> None:
+        async with gate:
+            await login()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(limited() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await beat
+
+    lags.sort()
+    return {
+        "mode": mode,
+        "logins_per_sec": round(logins / elapsed, 1),
+        "loop_lag_p50_ms": round(statistics.median(lags), 1) if lags else 0.0,
+        "loop_lag_p99_ms": round(lags[min(len(lags) - 1, int(len(lags) * 0.99))], 1) if lags else 0.0,
+        "loop_lag_max_ms": round(lags[-1], 1) if lags else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200, help="logins per mode")
+    parser.add_argument("--concurrency", type=int, default=32, help="logins in flight at once")
+    parser.add_argument("--rounds", type=int, default=None, help="PASSWORD_HASH_ROUNDS (default: configured value)")
+    parser.add_argument("--workers", type=int, default=None, help="PASSWORD_HASH_WORKERS (default: configured value)")
+    args = parser.parse_args()
+
+    if args.rounds is not None:
+        os.environ["PASSWORD_HASH_ROUNDS"] = str(args.rounds)
+    if args.workers is not None:
+        os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+    os.environ["PASSWORD_HASH_MAX_PENDING"] = str(max(args.concurrency, 64))
+
+    from app.core import security  # type: ignore
+
+    stored_hash = security.hash_password("correct horse")
+
+    print("\n" + "=" * 60)
+    print(
+        f"Login throughput ({args.logins} logins, concurrency {args.concurrency}, "
+        f"{security.PASSWORD_HASH_ROUNDS} rounds, {security.PASSWORD_HASH_WORKERS} hash threads)"
+    )
+    print("=" * 60)
+
+    results = []
+    for mode in ("inline", "executor"):
+        result = asyncio.run(run_logins(mode, args.logins, args.concurrency, stored_hash))
+        security.shutdown_password_hashing()
+        results.append(result)
+        print(
+            f"  {result['mode']:<9} {result['logins_per_sec']:>8} logins/s | "
+            f"loop lag p50 {result['loop_lag_p50_ms']:>7} ms | "
+            f"p99 {result['loop_lag_p99_ms']:>7} ms | max {result['loop_lag_max_ms']:>7} ms"
+        )
+
+    inline, executor = results
+    print(
+        f"\n  executor: {executor['logins_per_sec'] / inline['logins_per_sec']:.1f}x throughput, "
+        f"worst loop stall {inline['loop_lag_max_ms']} ms -> {executor['loop_lag_max_ms']} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""
+OCR benchmark and accuracy regression suite.
+
+Renders a synthetic receipt corpus with known ground truth (see receipt_corpus.py),
+runs every receipt through `extract_text_from_image` and `extract_receipt_data`,
+and reports:
+- per-stage latency percentiles (ocr, extract, total)
+- throughput overall and per core
+- peak memory (RSS) of the worker processes
+- how many receipts each OCR escalation tier answered
+- field-level precision and recall for vendor, amount, category and date
+
+Results are written as JSON so runs can be diffed against a baseline.
+
+Usage:
+    python benchmarks/ocr_accuracy.py --count 2000 --workers 4
+    python benchmarks/ocr_accuracy.py --mode text            # parser only, no Tesseract needed
+    python benchmarks/ocr_accuracy.py --compare benchmarks/results/baseline.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+# Setup path
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT.parent / "backend"))
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from receipt_corpus import generate_corpus, render_sample  # type: ignore
+
+FIELDS = ["vendor", "amount", "category", "date"]
+DEFAULT_VENDOR = "Receipt Item"
+
+
+def _peak_rss_mb() -> float:
+    if resource is None:
+        return 0.0
+    # ru_maxrss is KB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def process_sample(sample: dict, mode: str) -> dict:
+    """Run one receipt through the pipeline (executed in a worker process)."""
+    from app.ocr.ocr_service import (  # type: ignore
+        extract_text_from_image,
+        extract_receipt_data,
+        receipt_field_completeness,
+    )
+
+    timings = {}
+    status = "success"
+    tier = None
+
+    if mode == "ocr":
+        image_bytes = render_sample(sample)
+        t0 = time.perf_counter()
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            ocr_result = extract_text_from_image(image_bytes, completeness=receipt_field_completeness)
+        timings["ocr"] = (time.perf_counter() - t0) * 1000
+        status = ocr_result.get("status")
+        tier = ocr_result.get("ocr_tier")
+        text = ocr_result.get("raw_text") or ocr_result.get("text", "")
+    else:
+        text = sample["text"]
+
+    t0 = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        data = extract_receipt_data(text)
+    timings["extract"] = (time.perf_counter() - t0) * 1000
+    timings["total"] = sum(timings.values())
+
+    return {
+        "id": sample["id"],
+        "status": status,
+        "ocr_tier": tier,
+        "timings": timings,
+        "predicted": {
+            "vendor": data.get("vendor"),
+            "amount": data.get("amount"),
+            "category": data.get("category"),
+            "date": data.get("detected_date"),
+        },
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _normalize_vendor(value) -> str:
+    return " ".join(str(value or "").lower().split())
+
+
+def _is_present(field: str, value) -> bool:
+    if value is None:
+        return False
+    if field == "vendor":
+        return value != DEFAULT_VENDOR
+    return True
+
+
+def _is_correct(field: str, predicted, truth) -> bool:
+    if field == "vendor":
+        return _normalize_vendor(predicted) == _normalize_vendor(truth)
+    if field == "amount":
+        return abs(float(predicted) - float(truth)) < 0.01
+    return predicted == truth
+
+
+def _percentiles(values: list) -> dict:
+    if not values:
+        return {}
+    values = sorted(values)
+
+    def pct(p):
+        return round(values[min(len(values) - 1, int(len(values) * p))], 2)
+
+    return {
+        "mean": round(sum(values) / len(values), 2),
+        "p50": pct(0.50),
+        "p90": pct(0.90),
+        "p99": pct(0.99),
+        "max": round(values[-1], 2),
+    }
+
+
+def score(corpus: list, results: list) -> tuple:
+    """Field-level precision/recall plus a sample of mismatches."""
+    truth_by_id = {sample["id"]: sample["truth"] for sample in corpus}
+    counts = {field: {"tp": 0, "fp": 0, "fn": 0} for field in FIELDS}
+    by_date_format = {}
+    mismatches = []
+
+    for result in results:
+        truth = truth_by_id[result["id"]]
+        fmt_stats = by_date_format.setdefault(truth["date_format"], {"correct": 0, "total": 0})
+        fmt_stats["total"] += 1
+
+        for field in FIELDS:
+            predicted = result["predicted"][field]
+            if not _is_present(field, predicted):
+                counts[field]["fn"] += 1
+                correct = False
+            elif _is_correct(field, predicted, truth[field]):
+                counts[field]["tp"] += 1
+                correct = True
+            else:
+                counts[field]["fp"] += 1
+                counts[field]["fn"] += 1
+                correct = False
+
+            if field == "date" and correct:
+                fmt_stats["correct"] += 1
+            if not correct and len(mismatches) < 25:
+                mismatches.append({
+                    "id": result["id"],
+                    "field": field,
+                    "expected": truth[field],
+                    "predicted": predicted,
+                })
+
+    accuracy = {}
+    for field, c in counts.items():
+        precision = c["tp"] / (c["tp"] + c["fp"]) if c["tp"] + c["fp"] else 0.0
+        recall = c["tp"] / (c["tp"] + c["fn"]) if c["tp"] + c["fn"] else 0.0
+        accuracy[field] = {"precision": round(precision, 4), "recall": round(recall, 4), **c}
+
+    date_recall = {
+        fmt: round(stats["correct"] / stats["total"], 4)
+        for fmt, stats in sorted(by_date_format.items())
+    }
+    return accuracy, date_recall, mismatches
+
+
+def run(args) -> dict:
+    corpus = generate_corpus(args.count, seed=args.seed)
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(
+            process_sample,
+            corpus,
+            [args.mode] * len(corpus),
+            chunksize=max(1, len(corpus) // (args.workers * 8)),
+        ))
+    wall_time = time.perf_counter() - start
+
+    accuracy, date_recall, mismatches = score(corpus, results)
+    stages = ["ocr", "extract", "total"] if args.mode == "ocr" else ["extract", "total"]
+
+    from app.ocr.engine import OCR_ENGINE  # type: ignore
+
+    return {
+        "run": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "mode": args.mode,
+            "count": args.count,
+            "seed": args.seed,
+            "workers": args.workers,
+            "ocr_engine": OCR_ENGINE,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "latency_ms": {
+            stage: _percentiles([r["timings"][stage] for r in results if stage in r["timings"]])
+            for stage in stages
+        },
+        "throughput": {
+            "wall_time_s": round(wall_time, 2),
+            "receipts_per_sec": round(len(results) / wall_time, 2),
+            "receipts_per_sec_per_core": round(len(results) / wall_time / args.workers, 2),
+        },
+        "memory": {
+            "peak_worker_rss_mb": max(r["peak_rss_mb"] for r in results),
+            "ocr_errors": sum(1 for r in results if r["status"] != "success"),
+        },
+        "ocr_tiers": {
+            tier: sum(1 for r in results if r["ocr_tier"] == tier)
+            for tier in sorted({r["ocr_tier"] for r in results if r["ocr_tier"]})
+        },
+        "accuracy": accuracy,
+        "date_recall_by_format": date_recall,
+        "mismatches": mismatches,
+    }
+
+
+def _flatten(report: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in report.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(report: dict, baseline: dict) -> None:
+    """Print metric deltas against a previous run."""
+    sections = ("latency_ms", "throughput", "memory", "ocr_tiers", "accuracy")
+    current = _flatten({k: report.get(k, {}) for k in sections})
+    previous = _flatten({k: baseline.get(k, {}) for k in sections})
+
+    print("\n" + "=" * 70)
+    print("Comparison with baseline")
+    print("=" * 70)
+    for name in sorted(current):
+        if name not in previous:
+            continue
+        old, new = previous[name], current[name]
+        if old == new:
+            continue
+        change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+        print(f"  {name:<45} {old:>10} -> {new:<10} ({change})")
+
+
+def print_report(report: dict) -> None:
+    print("\n" + "=" * 70)
+    print(f"OCR receipt benchmark ({report['run']['count']} receipts, mode={report['run']['mode']}, "
+          f"workers={report['run']['workers']})")
+    print("=" * 70)
+
+    print("\nLatency (ms):")
+    for stage, stats in report["latency_ms"].items():
+        print(f"  {stage:<8} mean {stats['mean']:>8} | p50 {stats['p50']:>8} | "
+              f"p90 {stats['p90']:>8} | p99 {stats['p99']:>8} | max {stats['max']:>8}")
+
+    tp = report["throughput"]
+    print(f"\nThroughput: {tp['receipts_per_sec']} receipts/s "
+          f"({tp['receipts_per_sec_per_core']} per core, {tp['wall_time_s']} s wall)")
+    print(f"Peak worker RSS: {report['memory']['peak_worker_rss_mb']} MB, "
+          f"OCR errors: {report['memory']['ocr_errors']}")
+    if report["ocr_tiers"]:
+        print("Answered by tier: " + ", ".join(f"{tier} {n}" for tier, n in report["ocr_tiers"].items()))
+
+    print("\nAccuracy:")
+    for field, stats in report["accuracy"].items():
+        print(f"  {field:<9} precision {stats['precision']:.3f} | recall {stats['recall']:.3f}")
+
+    print("\nDate recall by format:")
+    for fmt, recall in report["date_recall_by_format"].items():
+        print(f"  {fmt:<12} {recall:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=1000, help="number of synthetic receipts")
+    parser.add_argument("--seed", type=int, default=42, help="corpus seed")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--mode", choices=["ocr", "text"], default="ocr",
+                        help="ocr: render and OCR images; text: feed ground-truth text to the parser")
+    parser.add_argument("--output", help="JSON results path (default: benchmarks/results/<mode>-<timestamp>.json)")
+    parser.add_argument("--compare", help="baseline JSON to diff against")
+    args = parser.parse_args()
+
+    report = run(args)
+    print_report(report)
+
+    output = Path(args.output) if args.output else (
+        ROOT / "results" / f"ocr_accuracy-{args.mode}-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\n✓ Results written to {output}")
+
+    if args.compare:
+        compare(report, json.loads(Path(args.compare).read_text(encoding="utf-8")))
+
+
+if __name__ == "__main__":
+    main()
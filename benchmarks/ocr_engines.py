@@ -0,0 +1,106 @@
+"""
+Benchmark OCR engine backends.
+Compares per-image overhead of the in-process tesserocr backend against the
+pytesseract subprocess backend on small synthetic receipts.
+
+Usage:
+    python benchmarks/ocr_engines.py --images 50
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Setup path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from PIL import Image, ImageDraw, ImageFont  # type: ignore
+
+from app.ocr.engine import create_engine  # type: ignore
+
+
+def make_receipt(index: int) -> Image.Image:
+    """Render a small receipt image with a few lines of text."""
+    img = Image.new("L", (420, 220), color=255)
+    draw = ImageDraw.Draw(img)
+    try:
+        font = ImageFont.truetype("DejaVuSans.ttf", 18)
+    except OSError:
+        font = ImageFont.load_default()
+
+    lines = [
+        f"CITY CAFE #{index}",
+        "Date : 09/01/2026",
+        f"Coffee          {40 + index % 50}.00",
+        f"TOTAL           {120 + index}.50",
+    ]
+    for row, line in enumerate(lines):
+        draw.text((20, 20 + row * 45), line, fill=0, font=font)
+    return img
+
+
+def bench_engine(name: str, images, psm: int) -> dict:
+    start = time.perf_counter()
+    engine = create_engine(name)
+    # First call pays for traineddata loading
+    engine.recognize(images[0], psm=psm)
+    cold_ms = (time.perf_counter() - start) * 1000
+
+    timings = []
+    for image in images:
+        t0 = time.perf_counter()
+        engine.recognize(image, psm=psm)
+        timings.append((time.perf_counter() - t0) * 1000)
+
+    timings.sort()
+    return {
+        "engine": engine.name,
+        "cold_start_ms": round(cold_ms, 1),
+        "mean_ms": round(statistics.mean(timings), 1),
+        "p50_ms": round(timings[len(timings) // 2], 1),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 1),
+        "images_per_sec": round(1000 / statistics.mean(timings), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=50, help="number of receipts per engine")
+    parser.add_argument("--psm", type=int, default=6, help="Tesseract page segmentation mode")
+    parser.add_argument("--engines", default="tesserocr,pytesseract", help="comma-separated engine names")
+    args = parser.parse_args()
+
+    images = [make_receipt(i) for i in range(args.images)]
+
+    print("\n" + "=" * 60)
+    print(f"OCR engine benchmark ({args.images} images, psm {args.psm})")
+    print("=" * 60)
+
+    results = []
+    for name in args.engines.split(","):
+        name = name.strip()
+        try:
+            result = bench_engine(name, images, args.psm)
+        except Exception as e:
+            print(f"  ✗ {name}: unavailable ({str(e)[:60]})")
+            continue
+        results.append(result)
+        print(
+            f"  ✓ {result['engine']:<12} cold {result['cold_start_ms']:>8} ms | "
+            f"mean {result['mean_ms']:>7} ms | p50 {result['p50_ms']:>7} ms | "
+            f"p95 {result['p95_ms']:>7} ms | {result['images_per_sec']:>6} img/s"
+        )
+
+    if len(results) >= 2:
+        fastest = min(results, key=lambda r: r["mean_ms"])
+        slowest = max(results, key=lambda r: r["mean_ms"])
+        saved = slowest["mean_ms"] - fastest["mean_ms"]
+        print(f"\n  {fastest['engine']} saves {saved:.1f} ms per image over {slowest['engine']}")
+
+
+if __name__ == "__main__":
+    main()
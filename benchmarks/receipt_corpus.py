@@ -0,0 +1,137 @@
+"""
+Synthetic receipt corpus with known ground truth.
+
+Every sample is generated from a seed, so a corpus is reproducible from
+(seed, count) alone and can be rendered independently in worker processes.
+Dates cover every format handled by `_parse_date_str` in the OCR service.
+"""
+
+import io
+import random
+from datetime import date, datetime
+
+from PIL import Image, ImageDraw, ImageFilter, ImageFont  # type: ignore
+
+
+# (vendor as printed, category, item names[, vendor expected from the scanner])
+# The expected vendor is the printed one unless given explicitly.
+VENDORS = [
+    ("Royal Biryani House", "food", ["Chicken Biryani", "Mutton Biryani", "Raita", "Lime Soda"]),
+    ("City Cafe", "food", ["Cappuccino", "Veg Sandwich", "Brownie", "Cold Coffee"]),
+    ("Green Leaf Restaurant", "food", ["Meals", "Paneer Masala", "Butter Naan", "Sweet Lassi"]),
+    ("Anand Bakery", "food", ["Plum Cake", "Veg Puff", "Milk Bread", "Cookies"]),
+    ("Sea View Lodge", "accommodation", ["Room Charges", "Extra Bed", "Room Service"]),
+    ("Harbor Inn", "accommodation", ["Deluxe Room", "Night Stay", "Laundry"]),
+    ("Hilltop Homestay", "accommodation", ["Double Room", "Stay Charges"]),
+    ("Metro Taxi Service", "transport", ["Airport Fare", "Waiting Charges", "Toll"]),
+    ("Indian Oil Petrol Bunk", "transport", ["Petrol", "Diesel"]),
+    ("Sharma Travels", "transport", ["Bus Ticket", "Luggage Fare"]),
+    ("Sri Ram Traders", "shopping", ["Rice Bag", "Sugar", "Cooking Oil"]),
+    ("Fresh Mart Supermarket", "shopping", ["Grocery Items", "Soap", "Shampoo"]),
+    ("Lakshmi Textiles", "shopping", ["Cotton Saree", "Shirt Cloth", "Dhoti"]),
+    # Known miss: the vendor directory lists the chain as "PVR Cinemas", and a
+    # near match that does not contain that name is reported under it
+    ("PVR Cinema", "activities", ["Movie Tickets", "Popcorn Combo"]),
+    ("City Museum", "activities", ["Entry Tickets", "Audio Guide"]),
+    ("Wonder Amusement Park", "activities", ["Admission", "Ride Pass"]),
+    # Canonicalisation: a misprinted chain name resolves to the directory entry
+    ("Cafe Cofee Day", "food", ["Cappuccino", "Cafe Frappe", "Samosa"], "Cafe Coffee Day"),
+]
+
+# strftime format -> whether the rendered string carries a year
+DATE_FORMATS = [
+    ("%d/%m/%Y", True), ("%m/%d/%Y", True), ("%d/%m/%y", True), ("%m/%d/%y", True),
+    ("%d-%m-%Y", True), ("%d-%m-%y", True), ("%m-%d-%Y", True), ("%m-%d-%y", True),
+    ("%b %d %Y", True), ("%b %d, %Y", True), ("%B %d %Y", True), ("%B %d, %Y", True),
+    ("%d %b %Y", True), ("%d %B %Y", True), ("%d %b, %Y", True), ("%d %B, %Y", True),
+    ("%b %d", False), ("%B %d", False), ("%d %b", False), ("%d %B", False),
+]
+
+DATE_LABELS = ["Date : ", "Date: ", "Date:", ""]
+CURRENCIES = ["", "Rs.", "₹", "$", "INR "]
+
+
+def make_sample(seed: int, index: int) -> dict:
+    """Build the ground truth and receipt text for one sample."""
+    rng = random.Random(seed * 1_000_003 + index)
+    vendor, category, items, *expected = rng.choice(VENDORS)
+    fmt, has_year = rng.choice(DATE_FORMATS)
+
+    # Month-first formats use a day above 12 so the expected date is unambiguous
+    day = rng.randint(13, 28) if fmt.startswith("%m") else rng.randint(1, 28)
+    year = rng.randint(2020, 2029) if has_year else datetime.utcnow().year
+    receipt_date = date(year, rng.randint(1, 12), day)
+
+    lines = [
+        vendor.upper() if rng.random() < 0.5 else vendor,
+        f"No {rng.randint(1, 250)}, MG Road",
+        f"Bill No: {rng.randint(1000, 99999)}",
+        f"{rng.choice(DATE_LABELS)}{receipt_date.strftime(fmt)}",
+        "-" * 32,
+    ]
+
+    total = 0.0
+    for item in rng.sample(items, k=min(len(items), rng.randint(1, 3))):
+        qty = rng.randint(1, 3)
+        price = round(rng.uniform(20, 900), 2)
+        total += qty * price
+        lines.append(f"{item:<18} {qty} {qty * price:>9.2f}")
+
+    total = round(total, 2)
+    lines += [
+        "-" * 32,
+        f"TOTAL {rng.choice(CURRENCIES)}{total:.2f}",
+        "Thank you visit again",
+    ]
+
+    return {
+        "id": index,
+        "seed": seed,
+        "text": "\n".join(lines),
+        "noise": round(rng.uniform(0, 40), 1),
+        "rotation": round(rng.uniform(-3, 3), 2),
+        "blur": round(rng.choice([0, 0, 0.5, 1.0, 1.5]), 1),
+        "truth": {
+            "vendor": expected[0] if expected else vendor,
+            "amount": total,
+            "category": category,
+            "date": receipt_date.isoformat(),
+            "date_format": fmt,
+        },
+    }
+
+
+def generate_corpus(count: int, seed: int = 42) -> list:
+    return [make_sample(seed, i) for i in range(count)]
+
+
+def _font(size: int):
+    for name in ("DejaVuSansMono.ttf", "DejaVuSans.ttf", "arial.ttf"):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size=size)
+
+
+def render_sample(sample: dict) -> bytes:
+    """Render a sample to PNG bytes with its noise, rotation and blur applied."""
+    lines = sample["text"].split("\n")
+    font = _font(22)
+    line_height = 34
+    img = Image.new("L", (620, 40 + line_height * len(lines)), color=255)
+    draw = ImageDraw.Draw(img)
+    for row, line in enumerate(lines):
+        draw.text((24, 20 + row * line_height), line, fill=0, font=font)
+
+    if sample["noise"]:
+        noise = Image.effect_noise(img.size, sample["noise"])
+        img = Image.blend(img, noise, 0.15)
+    if sample["rotation"]:
+        img = img.rotate(sample["rotation"], expand=True, fillcolor=255)
+    if sample["blur"]:
+        img = img.filter(ImageFilter.GaussianBlur(sample["blur"]))
+
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
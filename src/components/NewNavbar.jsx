@@ -31,7 +31,8 @@ export default function NewNavbar() {
       const data = await fetchProfile();
       setUserName(data.name || "");
       if (data.profile_image_url) {
-        setPhotoDataUrl(data.profile_image_url);
+        // Small avatar: prefer the pre-rendered thumbnail
+        setPhotoDataUrl(data.profile_thumbnails?.["64"] || data.profile_image_url);
       } else {
         setPhotoDataUrl("");
       }
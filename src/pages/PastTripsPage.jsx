@@ -16,6 +16,8 @@ function PastTripsPage() {
   const navigate = useNavigate();
   const [view, setView] = useState("menu"); // 'menu', 'trips', 'expenses', 'todos'
   const [trips, setTrips] = useState([]);
+  const [itineraries, setItineraries] = useState({}); // trip id -> itinerary text
+  const [loadingItineraryId, setLoadingItineraryId] = useState(null);
   const [expenses, setExpenses] = useState([]);
   const [todos, setTodos] = useState([]);
   const [selectedTripId, setSelectedTripId] = useState(null);
@@ -48,6 +50,29 @@ function PastTripsPage() {
     }
   };
 
+  // Fetch one trip's itinerary (trip lists only say whether one exists)
+  const fetchItinerary = async (tripId) => {
+    setLoadingItineraryId(tripId);
+    setError("");
+    try {
+      const token = localStorage.getItem("access_token");
+      if (!token) throw new Error("Authentication token not found");
+      const response = await fetch(`${BASE_URL}/trip/${tripId}/itinerary`, {
+        headers: { Authorization: `Bearer ${token}` },
+      });
+      if (!response.ok) {
+        const error = await response.json().catch(() => ({ detail: "Unknown error" }));
+        throw new Error(`Failed to fetch itinerary (${response.status}): ${error.detail || response.statusText}`);
+      }
+      const data = await response.json();
+      setItineraries((prev) => ({ ...prev, [tripId]: data.itinerary }));
+    } catch (err) {
+      setError(err.message);
+    } finally {
+      setLoadingItineraryId(null);
+    }
+  };
+
   // Fetch all expenses
   const fetchAllExpenses = async () => {
     setLoading(true);
@@ -232,16 +257,26 @@ function PastTripsPage() {
                     )}
                   </div>
 
-                  {trip.itinerary && (
+                  {trip.has_itinerary && (
                     <div className="itinerary-section">
                       <h4>Generated Itinerary</h4>
-                      <div className="itinerary-content">
-                        {trip.itinerary}
-                      </div>
+                      {itineraries[trip.id] !== undefined ? (
+                        <div className="itinerary-content">
+                          {itineraries[trip.id]}
+                        </div>
+                      ) : (
+                        <button
+                          className="view-itinerary-btn"
+                          onClick={() => fetchItinerary(trip.id)}
+                          disabled={loadingItineraryId === trip.id}
+                        >
+                          {loadingItineraryId === trip.id ? "Loading..." : "View itinerary"}
+                        </button>
+                      )}
                     </div>
                   )}
 
-                  {!trip.itinerary && (
+                  {!trip.has_itinerary && (
                     <div className="no-itinerary">
                       No itinerary generated for this trip
                     </div>
@@ -17,7 +17,7 @@ import {
 } from "react-icons/fi";
 
 import NewNavbar from "../components/NewNavbar";
-import { fetchProfile, updateProfile } from "../services/profileService";
+import { fetchProfile, signOut, updateProfile } from "../services/profileService";
 
 const SETTINGS_KEY = "travista.profile.settings";
 const PROFILE_PUBLIC_KEY = "travista.profile.public";
@@ -824,8 +824,8 @@ export default function ProfilePage() {
               <button
                 className="tv-btn danger"
                 type="button"
-                onClick={() => {
-                  localStorage.removeItem("access_token");
+                onClick={async () => {
+                  await signOut().catch(() => {});
                   setIsSignoutOpen(false);
                   navigate("/login");
                 }}
@@ -35,6 +35,9 @@ export default function SignupPage() {
 
       if (response.ok) {
         navigate("/login");
+      } else if (response.status === 429) {
+        const data = await response.json();
+        setError(data.detail);
       } else {
         setError("User already exists");
       }
@@ -31,3 +31,15 @@ export async function updateProfile(payload) {
   }
   return res.json();
 }
+
+// Revokes the current token on the server; the local token is dropped either way
+export async function signOut() {
+  try {
+    await fetch(`${BASE_URL}/auth/logout`, {
+      method: "POST",
+      headers: authHeaders(),
+    });
+  } finally {
+    localStorage.removeItem("access_token");
+  }
+}